@@ -0,0 +1,37 @@
+import time
+import numpy as np
+from scipy.io import loadmat
+from ecg_plot1_ekg_30sec_cli_v2 import SignalProcessing
+
+def load_ecg_from_mat(file_path):
+    mat = loadmat(file_path)
+    data = mat["data"]
+    feature = data[0:12]
+    return(feature)
+
+ecg = load_ecg_from_mat('example_ecg.mat')
+
+# 500 Hz example leads taken down to the 250 Hz the CLI runs at, one hour long
+fs = 250
+signal_processing = SignalProcessing(fs)
+rng = np.random.default_rng(0)
+for lead in range(12):
+    signal = np.tile(ecg[lead][::2], 360) + rng.normal(0, 0.02, 360 * 2500)
+    bandpass_filtered_ekg = signal_processing.bandpass_filter(signal, 0.5, 50, order=4)
+    moving_averaged_ekg = signal_processing.moving_average(bandpass_filtered_ekg, 20)
+    qrs_peaks = signal_processing.pan_tompkins_qrs_detect(bandpass_filtered_ekg)
+
+    t0 = time.perf_counter()
+    reference = signal_processing.combine_ekg_loop(bandpass_filtered_ekg, moving_averaged_ekg, qrs_peaks)
+    t1 = time.perf_counter()
+    combined = signal_processing.combine_ekg(bandpass_filtered_ekg, moving_averaged_ekg, qrs_peaks)
+    t2 = time.perf_counter()
+
+    # Same QRS boundaries and blend, only the summation order of the gap smoothing differs
+    assert np.allclose(combined, reference, rtol=0, atol=1e-12)
+    print(f"lead {lead:2d}: {len(qrs_peaks)} beats, loop {t1 - t0:.3f}s, vectorised {t2 - t1:.3f}s ({(t1 - t0) / (t2 - t1):.0f}x)")
+
+# Unsorted peaks go through the loop
+qrs_peaks = qrs_peaks[::-1]
+assert np.array_equal(signal_processing.combine_ekg(bandpass_filtered_ekg, moving_averaged_ekg, qrs_peaks),
+                      signal_processing.combine_ekg_loop(bandpass_filtered_ekg, moving_averaged_ekg, qrs_peaks))
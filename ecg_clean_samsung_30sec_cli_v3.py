@@ -1,31 +1,33 @@
-import wfdb
+from ecg_plot.wfdb_reader import open_wfdb_record
+from ecg_plot.csv_reader import read_ekg_csv, iter_ekg_csv
+from ecg_plot.signal_cache import SignalCache
+from ecg_plot.filters import FilterBank
 import numpy as np
 import argparse
 import pandas as pd
-from scipy.signal import butter, filtfilt, find_peaks
+from scipy.signal import find_peaks
 
 class SignalProcessing:
     def __init__(self, fs=250):
         self.fs = fs
+        self.filter_bank = FilterBank(fs)
 
-    def bandpass_filter(self, signal, lowcut, highcut, order=5):
-        nyquist = 0.5 * self.fs
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        b, a = butter(order, [low, high], btype='band')
-        return filtfilt(b, a, signal)
+    def bandpass_filter(self, signal, lowcut, highcut, order=5, axis=-1):
+        # Cached second-order-sections design, signal can be a 2-D batch with time along axis
+        return self.filter_bank.bandpass(signal, lowcut, highcut, order, axis=axis)
 
 class EKGProcessor:
-    def __init__(self, fs=250, baseline=170, window_size=20):
+    def __init__(self, fs=250, baseline=170, window_size=20, cache_dir=None):
         self.fs = fs
         self.baseline = baseline
         self.window_size = window_size
         self.signal_processing = SignalProcessing(fs)
+        # Parsed recordings are kept as .npy under cache_dir and reused while the source is unchanged
+        self.cache = SignalCache(cache_dir) if cache_dir else None
 
     def process_csv_ekg(self, input_file, output_file):
-        ekg_data = pd.read_csv(input_file, header=None)
-        ekg_values = ekg_data.values[:, 1] - np.mean(ekg_data.values[:, 1]) # + self.baseline
-        timestamps = ekg_data.values[:, 0]
+        timestamps, values = read_ekg_csv(input_file, cache=self.cache)
+        ekg_values = np.subtract(values, np.mean(values, dtype=np.float64), dtype=np.float64) # + self.baseline
 
         bandpass_filtered_ekg = self.signal_processing.bandpass_filter(ekg_values, 0.5, 50, order=4)
 
@@ -37,11 +39,47 @@ class EKGProcessor:
 
         return bandpass_filtered_ekg, timestamps
 
+    def process_csv_ekg_stream(self, input_file, output_file, block_seconds=300):
+        """
+        Clean a CSV of any length with constant memory: one pass for the mean, one pass that
+        band-passes overlapping blocks and appends them to output_file (.csv, or .npy for binary).
+        Matches process_csv_ekg() to ~1e-10.
+        """
+        block_size = int(block_seconds * self.fs)
+
+        # Pass 1: streaming mean, the same offset process_csv_ekg() removes
+        total, num_samples = 0.0, 0
+        for _, values in iter_ekg_csv(input_file, block_size, usecols='value'):
+            total += np.sum(values, dtype=np.float64)
+            num_samples += len(values)
+        if num_samples == 0:
+            raise ValueError(f"No samples in '{input_file}'.")
+        mean = total / num_samples
+
+        # Pass 2: filter block by block and write each block as soon as it is ready
+        blocks = iter_ekg_csv(input_file, block_size)
+        cleaned_blocks = self.signal_processing.filter_bank.bandpass_stream(blocks, 0.5, 50, order=4, block_size=block_size, offset=mean)
+        if output_file.endswith('.npy'):
+            cleaned = np.lib.format.open_memmap(output_file, mode='w+', dtype=[('timestamp', np.int64), ('ekg', np.float64)], shape=(num_samples,))
+            position = 0
+            for timestamps, bandpass_filtered_ekg in cleaned_blocks:
+                cleaned['timestamp'][position:position + len(timestamps)] = timestamps
+                cleaned['ekg'][position:position + len(timestamps)] = bandpass_filtered_ekg
+                position += len(timestamps)
+            cleaned.flush()
+            del cleaned
+        else:
+            with open(output_file, 'w', newline='') as f:
+                for i, (timestamps, bandpass_filtered_ekg) in enumerate(cleaned_blocks):
+                    pd.DataFrame({'Timestamp': timestamps, 'EKG': bandpass_filtered_ekg}).to_csv(f, header=(i == 0), index=False)
+
+        return num_samples
+
     def process_wfdb_ekg(self, record_name, channel_id, start_sec, end_sec):
-        signals, fields = wfdb.rdsamp(record_name)
-        fs = fields['fs']
-        num_samples = signals.shape[0]
-        timestamps = np.arange(num_samples) / fs
+        # Header is parsed once per record, only the window of one channel is read from the .dat
+        record = open_wfdb_record(record_name, cache=self.cache)
+        fs = record.fs
+        num_samples = record.num_samples
 
         idx_start = int(start_sec * fs)
         idx_end = int(end_sec * fs)
@@ -49,8 +87,8 @@ class EKGProcessor:
         idx_start = max(idx_start, 0)
         idx_end = min(idx_end, num_samples - 1)
 
-        ekg_signal = signals[idx_start:idx_end, channel_id]
-        plot_timestamps = timestamps[idx_start:idx_end]
+        ekg_signal = record.physical(channel_id, idx_start, idx_end)
+        plot_timestamps = np.arange(idx_start, idx_end) / fs
 
         return ekg_signal, plot_timestamps, fs
 
@@ -64,15 +102,21 @@ def main():
     parser.add_argument('--fs', type=int, default=250, help='The sampling frequency of the EKG signal')
     parser.add_argument('--baseline', type=int, default=170, help='The baseline value to add to the EKG signal (for CSV format)')
     parser.add_argument('--window_size', type=int, default=20, help='The window size for moving average filtering')
+    parser.add_argument('--cache_dir', type=str, help='Directory to cache parsed recordings in, reused on later runs')
+    parser.add_argument('--stream', action='store_true', help='Clean a CSV block by block with constant memory, for multi-hour recordings (.npy output is binary)')
+    parser.add_argument('--block_seconds', type=int, default=300, help='Seconds of signal per block in --stream mode')
 
     args = parser.parse_args()
 
-    processor = EKGProcessor(fs=args.fs, baseline=args.baseline, window_size=args.window_size)
+    processor = EKGProcessor(fs=args.fs, baseline=args.baseline, window_size=args.window_size, cache_dir=args.cache_dir)
 
     if args.input.endswith('.dat'):
         ekg_signal, plot_timestamps, fs = processor.process_wfdb_ekg(args.input, args.channel, args.start, args.end)
     elif args.input.endswith('.csv'):
         output_file = args.output or f"{args.input}_cleaned.csv"
+        if args.stream:
+            processor.process_csv_ekg_stream(args.input, output_file, args.block_seconds)
+            return
         ekg_signal, plot_timestamps = processor.process_csv_ekg(args.input, output_file)
         fs = args.fs
     else:
@@ -1 +1,4 @@
-from .ecg_plot import plot_12, plot_1, show, show_svg, save_as_png, save_as_svg, save_as_jpg, plot, plot_single_channel_ekg_30sec
+from .ecg_plot import plot_12, plot_1, show, show_svg, save_as_png, save_as_svg, save_as_jpg, plot, plot_single_channel_ekg_30sec, ChartTemplate, chart_template
+from .raster import plot_single_channel_ekg_30sec_raster, save_raster_as_png
+from .montage import MontageWriter, save_montage
+from .image_writer import AsyncImageWriter, encode_image, render_figure
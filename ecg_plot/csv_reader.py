@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+import os
+import time
+import warnings
+import argparse
+import numpy as np
+
+# Samsung/iCon exports: no header, one "timestamp,value" row per sample
+CSV_SCHEMA = np.dtype([('timestamp', np.int64), ('value', np.float32)])
+CHUNK_ROWS = 1 << 20
+
+
+def _count_rows(input_file, block_size=1 << 24):
+    rows, last = 0, b'\n'
+    with open(input_file, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            rows += block.count(b'\n')
+            last = block[-1:]
+    return rows + (last != b'\n')
+
+
+def _read_csv_pandas(input_file, usecols):
+    """Generic path for files that do not match CSV_SCHEMA (header row, float timestamps, missing values)."""
+    import pandas as pd
+    ekg_data = pd.read_csv(input_file, header=None)
+    # Leading rows whose timestamp is not a number are header rows, read again past them so the columns get numeric dtypes
+    numeric = pd.to_numeric(ekg_data[0], errors='coerce').notna().to_numpy()
+    header_rows = int(np.argmax(numeric)) if numeric.any() else len(numeric)
+    if header_rows:
+        ekg_data = pd.read_csv(input_file, header=None, skiprows=header_rows)
+    values = pd.to_numeric(ekg_data[1], errors='coerce').to_numpy(dtype=np.float32)
+    return (None, values) if usecols == 'value' else (ekg_data[0].to_numpy(), values)
+
+
+def iter_ekg_csv(input_file, chunk_rows=CHUNK_ROWS, usecols=None):
+    """Yield (timestamps, values) blocks of at most chunk_rows rows, timestamps is None when usecols='value'."""
+    with open(input_file, 'r') as f, warnings.catch_warnings():
+        # loadtxt warns when the last block of a file with an exact multiple of chunk_rows rows is empty
+        warnings.simplefilter('ignore', UserWarning)
+        while True:
+            if usecols == 'value':
+                block = np.loadtxt(f, delimiter=',', usecols=1, dtype=np.float32, max_rows=chunk_rows, ndmin=1)
+                timestamps, values = None, block
+            else:
+                block = np.loadtxt(f, delimiter=',', dtype=CSV_SCHEMA, max_rows=chunk_rows, ndmin=1)
+                timestamps, values = block['timestamp'], block['value']
+            if block.size == 0:
+                return
+            yield timestamps, values
+            if block.size < chunk_rows:
+                return
+
+
+def read_ekg_csv(input_file, usecols=None, chunk_rows=None, cache=None):
+    """Parse a two column timestamp,value CSV straight into NumPy arrays.
+    # Arguments
+        input_file: CSV file without header
+        usecols   : None for both columns, 'value' to skip the timestamps
+        chunk_rows: parse at most this many rows at a time into preallocated arrays, bounds
+                    the parser's memory for very large files but is slower;
+                    None parses the file in one go
+        cache     : optional SignalCache, parsed arrays are reused while the file is unchanged
+    # Returns
+        timestamps, values: int64 and float32 arrays, timestamps is None when usecols='value'.
+                            Files that do not match the schema go through pandas instead.
+    """
+    if cache is not None:
+        arrays = cache.get_or_load(input_file, 'ekg_csv', lambda: dict(zip(('timestamps', 'values'), read_ekg_csv(input_file, chunk_rows=chunk_rows))))
+        return (None if usecols == 'value' else arrays['timestamps']), arrays['values']
+    try:
+        if chunk_rows is None:
+            if usecols == 'value':
+                return None, np.loadtxt(input_file, delimiter=',', usecols=1, dtype=np.float32, ndmin=1)
+            data = np.loadtxt(input_file, delimiter=',', dtype=CSV_SCHEMA, ndmin=1)
+            return np.ascontiguousarray(data['timestamp']), np.ascontiguousarray(data['value'])
+
+        rows = _count_rows(input_file)
+        timestamps = None if usecols == 'value' else np.empty(rows, dtype=np.int64)
+        values = np.empty(rows, dtype=np.float32)
+        filled = 0
+        for block_timestamps, block_values in iter_ekg_csv(input_file, chunk_rows, usecols):
+            end = filled + len(block_values)
+            if timestamps is not None:
+                timestamps[filled:end] = block_timestamps
+            values[filled:end] = block_values
+            filled = end
+        return (None if timestamps is None else timestamps[:filled]), values[:filled]
+    except ValueError:
+        return _read_csv_pandas(input_file, usecols)
+
+
+def benchmark(input_file, repeat=5):
+    """Best of `repeat` wall times of the pandas path the CLIs used and of read_ekg_csv()."""
+    import pandas as pd
+
+    def pandas_path():
+        ekg_data = pd.read_csv(input_file, header=None)
+        return ekg_data.values[:, 1] - np.mean(ekg_data.values[:, 1]), ekg_data.values[:, 0]
+
+    def fast_path(**kwargs):
+        timestamps, values = read_ekg_csv(input_file, **kwargs)
+        return np.subtract(values, np.mean(values, dtype=np.float64), dtype=np.float64), timestamps
+
+    cases = [
+        ('pandas read_csv', pandas_path),
+        ('read_ekg_csv', fast_path),
+        ("read_ekg_csv usecols='value'", lambda: fast_path(usecols='value')),
+        ('read_ekg_csv chunk_rows=%d' % (CHUNK_ROWS // 16), lambda: fast_path(chunk_rows=CHUNK_ROWS // 16)),
+    ]
+    results = []
+    for name, run in cases:
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - t0)
+        results.append((name, min(times)))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark CSV ingest against the pandas path.')
+    parser.add_argument('inputs', type=str, nargs='+', help='timestamp,value CSV files')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case, the best one is reported')
+    args = parser.parse_args()
+
+    for input_file in args.inputs:
+        print(f"{input_file} ({os.path.getsize(input_file) / 1e6:.1f} MB)")
+        results = benchmark(input_file, args.repeat)
+        baseline = results[0][1]
+        for name, seconds in results:
+            print(f"  {name:32s} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x")
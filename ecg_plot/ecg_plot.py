@@ -2,10 +2,63 @@
 
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.ticker import AutoMinorLocator
+from matplotlib.collections import LineCollection
 import os
 from math import ceil 
 
+# Decimation assumes the chart is saved at save_as_png()'s default dpi
+DECIMATE_DPI = 300
+
+def _decimate_minmax(ecg, columns):
+    """Min/max (M4) decimation along the last axis, at most 4 points per pixel column.
+    Each column keeps its first, min, max and last sample in time order, so peaks survive.
+    Returns sample indices and values, unchanged when the signal already fits.
+    """
+    ecg = np.asarray(ecg)
+    n = ecg.shape[-1]
+    columns = max(int(columns), 1)
+    if n <= 4 * columns:
+        return np.broadcast_to(np.arange(n), ecg.shape), ecg
+
+    per_column = int(ceil(n / columns))
+    bins = int(ceil(n / per_column))
+    pad = [(0, 0)] * (ecg.ndim - 1) + [(0, bins * per_column - n)]
+    binned = np.pad(ecg, pad, mode='edge').reshape(ecg.shape[:-1] + (bins, per_column))
+
+    picks = np.empty(binned.shape[:-1] + (4,), dtype=np.int64)
+    picks[..., 0] = 0
+    picks[..., 1] = binned.argmin(axis=-1)
+    picks[..., 2] = binned.argmax(axis=-1)
+    picks[..., 3] = per_column - 1
+    picks.sort(axis=-1)
+
+    index = np.minimum(picks + (np.arange(bins) * per_column)[:, None], n - 1)
+    index = index.reshape(ecg.shape[:-1] + (4 * bins,))
+    return index, np.take_along_axis(ecg, index, axis=-1)
+
+def _axes_columns(ax, fraction=1.0):
+    # Pixel columns the axes (or a fraction of it) takes up in the saved image
+    return ax.get_position().width * fraction * ax.figure.get_figwidth() * DECIMATE_DPI
+
+def _line_data(ecg, sample_rate, columns, decimate=True):
+    if decimate:
+        index, values = _decimate_minmax(ecg, columns)
+    else:
+        values = np.asarray(ecg)
+        index = np.broadcast_to(np.arange(values.shape[-1]), values.shape)
+    return index * (1.0 / sample_rate), values
+
+def _leads_line_data(ecg, lead_order, sample_rate, columns, decimate=True):
+    # Leads of one length are decimated as one (leads x n) array, leads of different lengths one by one
+    leads = [ecg[i] for i in lead_order]
+    if len(set(len(lead) for lead in leads)) <= 1:
+        return _line_data(np.asarray(leads), sample_rate, columns, decimate)
+    data = [_line_data(lead, sample_rate, columns, decimate) for lead in leads]
+    return [x for x, _ in data], [y for _, y in data]
+
 def _ax_plot(ax, x, y, secs=10, lwidth=0.5, amplitude_ecg = 1.8, time_ticks =0.2):
     ax.set_xticks(np.arange(0,11,time_ticks))    
     ax.set_yticks(np.arange(-ceil(amplitude_ecg),ceil(amplitude_ecg),1.0))
@@ -36,7 +89,8 @@ def plot_12(
         columns     = 2,
         speed = 50,
         voltage = 20,
-        line_width = 0.6
+        line_width = 0.6,
+        decimate = True
         ):
     """Plot multi lead ECG chart.
     # Arguments
@@ -50,6 +104,7 @@ def plot_12(
         speed      : signal speed on display, defaults to 50 mm / sec
         voltage    : signal voltage on display, defaults to 20 mm / mV
         line_width : line width, default to 0.6
+        decimate   : reduce each lead to at most 4 points per pixel column, keeping peaks
     """
     if not lead_order:
         lead_order = list(range(0,len(ecg)))
@@ -75,7 +130,9 @@ def plot_12(
         )
     fig.suptitle(title)
 
-    step = 1.0/sample_rate
+    # All subplots share one width, decimate every lead against one time axis at once
+    axes = np.ravel(ax)
+    x, y = _leads_line_data(ecg, lead_order, sample_rate, _axes_columns(axes[0]), decimate)
 
     for i in range(0, len(lead_order)):
         if(columns == 1):
@@ -86,7 +143,7 @@ def plot_12(
         t_ax.set_ylabel(lead_index[t_lead])
         t_ax.tick_params(axis='x',rotation=90)
        
-        _ax_plot(t_ax, np.arange(0, len(ecg[t_lead])*step, step), ecg[t_lead], seconds)
+        _ax_plot(t_ax, x[i], y[i], seconds)
 
 def plot(
         ecg, 
@@ -100,6 +157,7 @@ def plot(
         show_lead_name = True,
         show_grid      = True,
         show_separate_line  = True,
+        decimate       = True,
         ):
     """Plot multi lead ECG chart.
     # Arguments
@@ -115,6 +173,7 @@ def plot(
         show_lead_name : show lead name
         show_grid      : show grid
         show_separate_line  : show separate line
+        decimate       : reduce each lead to at most 4 points per pixel column, keeping peaks
     """
 
     if not lead_order:
@@ -167,34 +226,35 @@ def plot(
     ax.set_xlim(x_min,x_max)
 
 
-    for c in range(0, columns):
-        for i in range(0, rows):
-            if (c * rows + i < leads):
-                y_offset = -(row_height/2) * ceil(i%rows)
-                # if (y_offset < -5):
-                #     y_offset = y_offset + 0.25
-
-                x_offset = 0
-                if(c > 0):
-                    x_offset = secs * c
-                    if(show_separate_line):
-                        ax.plot([x_offset, x_offset], [ecg[t_lead][0] + y_offset - 0.3, ecg[t_lead][0] + y_offset + 0.3], linewidth=line_width * display_factor, color=color_line)
-
-         
-                t_lead = lead_order[c * rows + i]
-         
-                step = 1.0/sample_rate
-                if(show_lead_name):
-                    ax.text(x_offset + 0.07, y_offset - 0.5, lead_index[t_lead], fontsize=9 * display_factor)
-                ax.plot(
-                    np.arange(0, len(ecg[t_lead])*step, step) + x_offset, 
-                    ecg[t_lead] + y_offset,
-                    linewidth=line_width * display_factor, 
-                    color=color_line
-                    )
+    # All leads go into one LineCollection built from a (leads x n x 2) vertex array (one array per lead
+    # when the leads differ in length), lead i of the display order sits in column i // rows, row i % rows
+    x, y = _leads_line_data(ecg, lead_order, sample_rate, _axes_columns(ax, 1 / columns), decimate)
+    places = np.arange(leads)
+    x_offsets = secs * (places // rows)
+    y_offsets = -(row_height/2) * (places % rows)
+
+    if isinstance(y, np.ndarray):
+        vertices = np.empty(y.shape + (2,))
+        np.add(x, x_offsets[:, None], out=vertices[:, :, 0])
+        np.add(y, y_offsets[:, None], out=vertices[:, :, 1])
+    else:
+        vertices = [np.column_stack([x[i] + x_offsets[i], y[i] + y_offsets[i]]) for i in places]
+    ax.add_collection(LineCollection(vertices, linewidths=line_width * display_factor, colors=[color_line], capstyle='projecting', joinstyle='round'))
+
+    separators = []
+    for place in places[places >= rows]:
+        # Separator height follows the lead placed just before, as it always has
+        first_value = ecg[lead_order[place - 1]][0] + y_offsets[place]
+        separators.append([(x_offsets[place], first_value - 0.3), (x_offsets[place], first_value + 0.3)])
+    if(show_separate_line and separators):
+        ax.add_collection(LineCollection(separators, linewidths=line_width * display_factor, colors=[color_line], capstyle='projecting', joinstyle='round'))
+
+    if(show_lead_name):
+        for place in places:
+            ax.text(x_offsets[place] + 0.07, y_offsets[place] - 0.5, lead_index[lead_order[place]], fontsize=9 * display_factor)
         
 
-def plot_1(ecg, sample_rate=500, title = 'ECG', fig_width = 15, fig_height = 2, line_w = 0.5, ecg_amp = 1.8, timetick = 0.2):
+def plot_1(ecg, sample_rate=500, title = 'ECG', fig_width = 15, fig_height = 2, line_w = 0.5, ecg_amp = 1.8, timetick = 0.2, decimate = True):
     """Plot multi lead ECG chart.
     # Arguments
         ecg        : m x n ECG signal data, which m is number of leads and n is length of signal.
@@ -202,6 +262,7 @@ def plot_1(ecg, sample_rate=500, title = 'ECG', fig_width = 15, fig_height = 2,
         title      : Title which will be shown on top off chart
         fig_width  : The width of the plot
         fig_height : The height of the plot
+        decimate   : reduce the signal to at most 4 points per pixel column, keeping peaks
     """
     plt.figure(figsize=(fig_width,fig_height))
     plt.suptitle(title)
@@ -217,8 +278,8 @@ def plot_1(ecg, sample_rate=500, title = 'ECG', fig_width = 15, fig_height = 2,
 
     ax = plt.subplot(1, 1, 1)
     #plt.rcParams['lines.linewidth'] = 5
-    step = 1.0/sample_rate
-    _ax_plot(ax,np.arange(0,len(ecg)*step,step),ecg, seconds, line_w, ecg_amp,timetick)
+    x, y = _line_data(ecg, sample_rate, _axes_columns(ax), decimate)
+    _ax_plot(ax, x, y, seconds, line_w, ecg_amp,timetick)
     
 DEFAULT_PATH = './'
 show_counter = 1
@@ -277,7 +338,7 @@ def plot_single_channel_ekg_30sec(ecg, sample_rate=240, title='ECG Single Lead',
     num_samples = int(secs * sample_rate)
 
     # Ensure the ECG data length matches the desired plot duration, truncate or pad if necessary
-    ecg = ecg[:num_samples] if len(ecg) > num_samples else np.pad(ecg, (0, max(0, num_samples - len(ecg))), 'constant')
+    ecg = _fit_length(ecg, num_samples)
 
     # Create time vector based on the number of samples and sample rate
     x = np.linspace(0, secs, num_samples)
@@ -295,7 +356,7 @@ def plot_single_channel_ekg_30sec(ecg, sample_rate=240, title='ECG Single Lead',
     #     plt.show()
 
 
-def _ax_plot_30(ax, x, y, secs=30, lwidth=0.5, amplitude_ecg = 1.8, time_ticks =0.2):
+def _ax_plot_30(ax, x, y, secs=30, lwidth=0.5, amplitude_ecg = 1.8, time_ticks =0.2, style=None):
     ax.set_xticks(np.arange(0,31,time_ticks))    
     ax.set_yticks(np.arange(-ceil(amplitude_ecg),ceil(amplitude_ecg),1.0))
 
@@ -309,8 +370,117 @@ def _ax_plot_30(ax, x, y, secs=30, lwidth=0.5, amplitude_ecg = 1.8, time_ticks =
     ax.set_ylim(-amplitude_ecg, amplitude_ecg)
     ax.set_xlim(0, secs)
 
-    ax.grid(which='major', linestyle='-', linewidth='0.5', color='red')
-    ax.grid(which='minor', linestyle='-', linewidth='0.5', color=(1, 0.7, 0.7))
+    if (style == 'bw'):
+        ax.grid(which='major', linestyle='-', linewidth='0.5', color=(0.4,0.4,0.4))
+        ax.grid(which='minor', linestyle='-', linewidth='0.5', color=(0.75, 0.75, 0.75))
+        ax.plot(x,y, linewidth=lwidth, color=(0,0,0))
+    else:
+        ax.grid(which='major', linestyle='-', linewidth='0.5', color='red')
+        ax.grid(which='minor', linestyle='-', linewidth='0.5', color=(1, 0.7, 0.7))
+        ax.plot(x,y, linewidth=lwidth)
+
+
+def _fit_length(ecg, num_samples):
+    return ecg[:num_samples] if len(ecg) > num_samples else np.pad(ecg, (0, max(0, num_samples - len(ecg))), 'constant')
 
-    ax.plot(x,y, linewidth=lwidth)
 
+_grid_backgrounds = {}
+def _grid_background(key, fig, hidden):
+    """RGBA image of the figure drawn without the hidden artists, cached by layout, dpi and style key."""
+    if key not in _grid_backgrounds:
+        for artist in hidden:
+            artist.set_visible(False)
+        fig.canvas.draw()
+        _grid_backgrounds[key] = np.array(fig.canvas.buffer_rgba())
+        for artist in hidden:
+            artist.set_visible(True)
+    return _grid_backgrounds[key]
+
+
+class ChartTemplate:
+    """Reusable single lead chart, the axes and grid are built once and every strip only updates the line data.
+    # Arguments
+        secs         : seconds shown on the chart
+        sample_rate  : Sample rate of the signal.
+        amplitude_ecg: y axis range in mV, from -amplitude_ecg to amplitude_ecg
+        figsize      : figure size in inches
+        dpi          : dots per inch (dpi) for the saved image
+        lwidth       : line width
+        time_ticks   : major time grid in seconds
+        style        : display style, defaults to None, can be 'bw' which means black white
+    """
+    def __init__(self, secs=30, sample_rate=240, amplitude_ecg=1.8, figsize=(20, 4), dpi=300, lwidth=0.5, time_ticks=1.0, style=None):
+        self.key = (secs, sample_rate, amplitude_ecg, tuple(figsize), dpi, lwidth, time_ticks, style)
+        self.num_samples = int(secs * sample_rate)
+        self.figsize = figsize
+        self.dpi = dpi
+
+        # Figure is not registered with pyplot, so save_as_png() and plt.close() never touch it
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        x = np.linspace(0, secs, self.num_samples)
+        _ax_plot_30(self.ax, x, np.zeros(self.num_samples), secs=secs, lwidth=lwidth, amplitude_ecg=amplitude_ecg, time_ticks=time_ticks, style=style)
+        self.line = self.ax.lines[-1]
+        self.position = self.ax.get_position()
+        self.layout = False
+
+    def plot(self, ecg):
+        """Replace the plotted signal, truncated or padded to the chart length."""
+        self.line.set_ydata(_fit_length(ecg, self.num_samples))
+
+    def _set_layout(self, layout):
+        # Shrink the figure to the area savefig(bbox_inches=layout) would keep, so the canvas is the saved image
+        if layout == self.layout:
+            return
+        self.fig.set_dpi(self.dpi)
+        self.fig.set_size_inches(self.figsize)
+        self.ax.set_position(self.position)
+        if layout == 'tight':
+            self.fig.canvas.draw()
+            bbox = self.fig.get_tightbbox(self.fig.canvas.get_renderer()).padded(plt.rcParams['savefig.pad_inches'])
+            width, height = self.figsize
+            pos = self.position
+            self.fig.set_size_inches(bbox.width, bbox.height)
+            self.ax.set_position([
+                (pos.x0 * width - bbox.x0) / bbox.width,
+                (pos.y0 * height - bbox.y0) / bbox.height,
+                pos.width * width / bbox.width,
+                pos.height * height / bbox.height
+                ])
+        self.fig.canvas.draw()
+        self.layout = layout
+
+    def render(self, layout='tight'):
+        """Return the current strip as an RGBA array, the trace is blitted onto the cached grid background.
+        # Arguments
+            layout   : Set equal to "tight" to include ax labels on the image
+        """
+        self._set_layout(layout)
+        spines = list(self.ax.spines.values())
+        background = _grid_background(self.key + (layout,), self.fig, [self.line] + spines)
+
+        buffer = np.asarray(self.fig.canvas.buffer_rgba())
+        buffer[...] = background
+        # Spines are drawn above the trace in a full draw, keep that order
+        for artist in [self.line] + spines:
+            self.ax.draw_artist(artist)
+        return buffer.copy()
+
+    def save_as_png(self, file_name, path = DEFAULT_PATH, layout='tight'):
+        """Save the current strip, same pixels as save_as_png() after plot_single_channel_ekg_30sec().
+        # Arguments
+            file_name: file_name
+            path     : path to save image, defaults to current folder
+            layout   : Set equal to "tight" to include ax labels on saved image
+        """
+        plt.imsave(path + file_name + '.png', self.render(layout), dpi = self.dpi)
+
+
+_chart_templates = {}
+def chart_template(secs=30, sample_rate=240, amplitude_ecg=1.8, figsize=(20, 4), dpi=300, lwidth=0.5, time_ticks=1.0, style=None):
+    """Return the cached ChartTemplate for this geometry, building it on first use."""
+    key = (secs, sample_rate, amplitude_ecg, tuple(figsize), dpi, lwidth, time_ticks, style)
+    if key not in _chart_templates:
+        _chart_templates[key] = ChartTemplate(secs, sample_rate, amplitude_ecg, figsize, dpi, lwidth, time_ticks, style)
+    return _chart_templates[key]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import matplotlib.pyplot as plt
+from PIL import Image
+from .ecg_plot import DEFAULT_PATH
+from .raster import encode_png
+
+IMAGE_FORMATS = ('png', 'webp', 'jpg')
+
+
+def encode_image(image, image_format='png', compress_level=1, quality=90, dpi=300):
+    """Encode an 8 bit RGB or RGBA image as PNG, WebP or JPEG bytes.
+    # Arguments
+        image         : RGB or RGBA array
+        image_format  : 'png', 'webp' or 'jpg'
+        compress_level: zlib level of PNGs, 1 (fastest) to 9 (smallest)
+        quality       : quality of WebP and JPEG, 100 makes WebP lossless
+        dpi           : dots per inch (dpi) stored in PNG and JPEG files
+    """
+    if image_format == 'png':
+        return encode_png(image, compress_level, dpi)
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format '{image_format}', expected one of {IMAGE_FORMATS}")
+    pil_image = Image.fromarray(image)
+    output = io.BytesIO()
+    if image_format == 'webp':
+        pil_image.save(output, 'WEBP', quality=quality, lossless=quality >= 100, method=0)
+    else:
+        pil_image.convert('RGB').save(output, 'JPEG', quality=quality, dpi=(dpi, dpi))
+    return output.getvalue()
+
+
+def render_figure(fig=None, dpi=300, layout='tight'):
+    """RGBA array of a figure, the same pixels savefig(dpi=dpi, bbox_inches=layout) writes to a PNG.
+    # Arguments
+        fig   : figure, defaults to the current pyplot figure
+        dpi   : dots per inch (dpi) of the image
+        layout: Set equal to "tight" to include ax labels on the image
+    """
+    fig = fig or plt.gcf()
+    raw = io.BytesIO()
+    fig.savefig(raw, format='rgba', dpi=dpi, bbox_inches=layout)
+    # The canvas keeps the renderer savefig drew with, its size is the size of the saved image
+    renderer = fig.canvas.renderer
+    return np.frombuffer(raw.getvalue(), dtype=np.uint8).reshape(int(renderer.height), int(renderer.width), 4)
+
+
+class AsyncImageWriter:
+    """Encodes and writes images on a bounded thread pool while the caller draws the next one.
+
+    zlib, PIL encoders and file writes release the GIL, so encoding and I/O of one strip overlap
+    with drawing the next. At most max_pending images are queued or being encoded, submit() blocks
+    until one finishes when that many are in flight, so memory stays bounded however far drawing
+    runs ahead.
+    # Arguments
+        threads       : encoding and writing threads
+        max_pending   : images queued or being encoded before submit() blocks, defaults to 2 per thread
+        image_format  : 'png', 'webp' or 'jpg', also the file extension
+        compress_level: zlib level of PNGs, 1 (fastest) to 9 (smallest)
+        quality       : quality of WebP and JPEG, 100 makes WebP lossless
+        dpi           : dots per inch (dpi) stored in PNG and JPEG files
+    """
+    def __init__(self, threads=2, max_pending=None, image_format='png', compress_level=1, quality=90, dpi=300):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{image_format}', expected one of {IMAGE_FORMATS}")
+        self.image_format = image_format
+        self.compress_level = compress_level
+        self.quality = quality
+        self.dpi = dpi
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.slots = threading.BoundedSemaphore(max_pending or 2 * threads)
+        self.futures = []
+
+    def _write(self, image, output_file):
+        try:
+            data = encode_image(image, self.image_format, self.compress_level, self.quality, self.dpi)
+            with open(output_file, 'wb') as f:
+                f.write(data)
+            return output_file
+        finally:
+            self.slots.release()
+
+    def submit(self, image, file_name, path = DEFAULT_PATH):
+        """
+        Queue an image for writing to path + file_name + '.<image_format>', blocks while max_pending images are in flight.
+        The image must not be changed afterwards, pass a copy of reused buffers.
+        # Returns
+            concurrent.futures.Future of the written file, its result() raises the encoding or write error
+        """
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self._write, image, f"{path}{file_name}.{self.image_format}")
+        except BaseException:
+            self.slots.release()
+            raise
+        self.futures.append(future)
+        return future
+
+    def submit_figure(self, file_name, path = DEFAULT_PATH, fig=None, layout='tight'):
+        """Rasterise a pyplot figure (the current one by default) here, close it and queue the image, as save_as_png() would write it."""
+        fig = fig or plt.gcf()
+        image = render_figure(fig, self.dpi, layout)
+        plt.close(fig)
+        return self.submit(image, file_name, path)
+
+    def wait(self):
+        """Block until every queued image is written or failed, no images can be submitted afterwards."""
+        self.executor.shutdown(wait=True)
+
+    def close(self):
+        """Wait for all queued images. Returns the written files, raises the first error after all others finished."""
+        self.wait()
+        files = [future.result() for future in self.futures]
+        self.futures = []
+        return files
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.wait()
+        if exc[0] is None:
+            self.close()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+
+import io
+import os
+import struct
+import numpy as np
+from PIL import Image
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from .ecg_plot import _ax_plot_30, _fit_length, _grid_background
+
+
+class _PdfPageStream:
+    """Minimal PDF writer with one image per page, pages go to disk as they are added and
+    the page tree and cross-reference table are written on close().
+
+    Page images are PNG-encoded and their IDAT data embedded as a FlateDecode stream with
+    the PNG predictor, which is smaller than JPEG for charts and lossless."""
+    def __init__(self, file_name, dpi):
+        self.f = open(file_name, 'wb')
+        self.dpi = dpi
+        self.offsets = {}
+        self.pages = []
+        self.next_id = 3            # 1 is the catalog, 2 the page tree
+        self.f.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+    def _object(self, object_id, body, stream=None):
+        self.offsets[object_id] = self.f.tell()
+        self.f.write(b'%d 0 obj\n' % object_id + body)
+        if stream is not None:
+            self.f.write(b'\nstream\n' + stream + b'\nendstream')
+        self.f.write(b'\nendobj\n')
+
+    @staticmethod
+    def _png_idat(image):
+        """Concatenated IDAT data of the PNG encoding of an RGB image: zlib data of filtered rows."""
+        png = io.BytesIO()
+        image.save(png, 'PNG', compress_level=3)
+        data, position, idat = png.getvalue(), 8, []
+        while position < len(data):
+            length, chunk_type = struct.unpack('>I4s', data[position:position + 8])
+            if chunk_type == b'IDAT':
+                idat.append(data[position + 8:position + 8 + length])
+            position += 12 + length
+        return b''.join(idat)
+
+    def add_page(self, image):
+        idat = self._png_idat(image)
+        width, height = image.size
+        width_pt, height_pt = width * 72.0 / self.dpi, height * 72.0 / self.dpi
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+
+        self._object(image_id, b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB /BitsPerComponent 8 '
+                               b'/Filter /FlateDecode /DecodeParms << /Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns %d >> '
+                               b'/Length %d >>' % (width, height, width, len(idat)), idat)
+        content = b'q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q' % (width_pt, height_pt)
+        self._object(content_id, b'<< /Length %d >>' % len(content), content)
+        self._object(page_id, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources << /XObject << /Im0 %d 0 R >> >> '
+                              b'/Contents %d 0 R >>' % (width_pt, height_pt, image_id, content_id))
+        self.pages.append(page_id)
+
+    def close(self):
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self.pages)
+        self._object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.pages)))
+        xref = self.f.tell()
+        self.f.write(b'xref\n0 %d\n0000000000 65535 f \n' % self.next_id)
+        for object_id in range(1, self.next_id):
+            self.f.write(b'%010d 00000 n \n' % self.offsets[object_id])
+        self.f.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (self.next_id, xref))
+        self.f.close()
+
+
+class MontageWriter:
+    """Writes many 30 second strips as pages of strips_per_page stacked charts, e.g. 6 strips as a 3 minute rhythm sheet.
+
+    The page figure and its grid are built once, the grid is rendered once and every page only
+    blits the traces and titles onto it. Pages are written as they fill up: streamed into one
+    multi-page PDF (a lossless image per page) when output_file ends in .pdf, otherwise one PNG sheet per page
+    (<name>_0001.png, <name>_0002.png, ...).
+    # Arguments
+        output_file    : .pdf file, or the PNG file name the page number is added to
+        strips_per_page: strips stacked on a page
+        secs           : seconds per strip
+        sample_rate    : Sample rate of the signal.
+        amplitude_ecg  : y axis range in mV, from -amplitude_ecg to amplitude_ecg
+        strip_size     : (width, height) in inches of one strip on the page
+        dpi            : dots per inch (dpi) of the pages
+        lwidth         : line width
+        time_ticks     : major time grid in seconds
+        style          : display style, defaults to None, can be 'bw' which means black white
+    """
+    def __init__(self, output_file, strips_per_page=6, secs=30, sample_rate=240, amplitude_ecg=1.8, strip_size=(20, 2.5),
+                 dpi=150, lwidth=0.5, time_ticks=1.0, style=None):
+        self.output_file = output_file
+        self.pdf = output_file.lower().endswith('.pdf')
+        self.strips_per_page = strips_per_page
+        self.num_samples = int(secs * sample_rate)
+        self.dpi = dpi
+        self.key = ('montage', strips_per_page, secs, sample_rate, amplitude_ecg, tuple(strip_size), dpi, lwidth, time_ticks, style)
+
+        width, height = strip_size
+        self.fig = Figure(figsize=(width, height * strips_per_page), dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        axes = self.fig.subplots(strips_per_page, 1, squeeze=False)[:, 0]
+        # Fixed margins in inches, so the page does not depend on the titles drawn on it
+        self.fig.subplots_adjust(left=0.6 / width, right=1 - 0.2 / width, bottom=0.5 / (height * strips_per_page),
+                                 top=1 - 0.35 / (height * strips_per_page), hspace=0.5)
+        x = np.linspace(0, secs, self.num_samples)
+        self.lines, self.titles = [], []
+        for ax in axes:
+            _ax_plot_30(ax, x, np.zeros(self.num_samples), secs=secs, lwidth=lwidth, amplitude_ecg=amplitude_ecg, time_ticks=time_ticks, style=style)
+            self.lines.append(ax.lines[-1])
+            self.titles.append(ax.set_title('', loc='left', fontsize=9))
+        self.axes = axes
+        self.fig.canvas.draw()
+
+        self.strips = []
+        self.pages = 0
+        self.files = [output_file] if self.pdf else []
+        self.pdf_stream = _PdfPageStream(output_file, dpi) if self.pdf else None
+
+    def add(self, ecg, title=''):
+        """Add the next strip, truncated or padded to the chart length; a full page is written right away."""
+        self.strips.append((_fit_length(np.asarray(ecg, dtype=np.float64), self.num_samples), title))
+        if len(self.strips) == self.strips_per_page:
+            self._write_page()
+
+    def render_page(self, strips):
+        """RGBA array of a page with up to strips_per_page (ecg, title) strips, the remaining slots are left blank."""
+        spines = [spine for ax in self.axes for spine in ax.spines.values()]
+        background = _grid_background(self.key, self.fig, self.lines + self.titles + spines)
+
+        buffer = np.asarray(self.fig.canvas.buffer_rgba())
+        buffer[...] = background
+        for i, ax in enumerate(self.axes):
+            if i < len(strips):
+                ecg, title = strips[i]
+                self.lines[i].set_ydata(ecg)
+                self.titles[i].set_text(title)
+                ax.draw_artist(self.lines[i])
+                ax.draw_artist(self.titles[i])
+            # Spines are drawn above the trace in a full draw, keep that order
+            for spine in ax.spines.values():
+                ax.draw_artist(spine)
+        return buffer.copy()
+
+    def _write_page(self):
+        image = Image.fromarray(self.render_page(self.strips)).convert('RGB')
+        self.strips = []
+        self.pages += 1
+        if self.pdf:
+            self.pdf_stream.add_page(image)
+        else:
+            base, extension = os.path.splitext(self.output_file)
+            page_file = f"{base}_{self.pages:04d}{extension or '.png'}"
+            image.save(page_file, 'PNG', dpi=(self.dpi, self.dpi))
+            self.files.append(page_file)
+
+    def close(self):
+        """Write the last, partly filled page. Returns the written files."""
+        if self.strips:
+            self._write_page()
+        if self.pdf_stream is not None:
+            self.pdf_stream.close()
+            self.pdf_stream = None
+        return self.files
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_montage(strips, output_file, titles=None, **kwargs):
+    """Write a list of strips with MontageWriter, returns the written files."""
+    titles = titles or [''] * len(strips)
+    with MontageWriter(output_file, **kwargs) as writer:
+        for ecg, title in zip(strips, titles):
+            writer.add(ecg, title)
+    return writer.files
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+import os
+import json
+import numpy as np
+from .wfdb_reader import open_wfdb_record
+
+PYRAMID_EXTENSION = '.pyramid'
+META_FILE = 'meta.json'
+BLOCK_SAMPLES = 1 << 22
+
+
+def pyramid_dir(record_name, channel=0, directory=None):
+    """Directory of the pyramid of one channel of a record, next to the record unless directory is given."""
+    base = os.path.basename(record_name) if directory else record_name
+    return os.path.join(directory or '', f"{base}.ch{channel}{PYRAMID_EXTENSION}")
+
+
+def _source_stat(record_name):
+    """mtime and size of the .hea and .dat, a pyramid is rebuilt when they change."""
+    stat = {}
+    for extension in ('.hea', '.dat'):
+        if os.path.exists(record_name + extension):
+            file_stat = os.stat(record_name + extension)
+            stat[extension] = [file_stat.st_mtime_ns, file_stat.st_size]
+    return stat
+
+
+def _reduce_bins(minimum, maximum, size):
+    """(bins, 2) min/max rows of every size values, NaN only where a whole bin is NaN."""
+    bins = -(-len(minimum) // size)
+    if bins * size != len(minimum):
+        pad = bins * size - len(minimum)
+        minimum = np.concatenate([minimum, np.full(pad, np.nan, dtype=minimum.dtype)])
+        maximum = np.concatenate([maximum, np.full(pad, np.nan, dtype=maximum.dtype)])
+    return np.stack([np.fmin.reduce(minimum.reshape(bins, size), axis=1), np.fmax.reduce(maximum.reshape(bins, size), axis=1)], axis=1)
+
+
+def _save_level(path, level_file, length, blocks):
+    """Write the (length, 2) float32 blocks to a .npy, through a temporary file."""
+    tmp_file = os.path.join(path, f"{level_file}.{os.getpid()}.tmp.npy")
+    level = np.lib.format.open_memmap(tmp_file, mode='w+', dtype=np.float32, shape=(length, 2))
+    position = 0
+    for block in blocks:
+        level[position:position + len(block)] = block
+        position += len(block)
+    level.flush()
+    del level
+    os.replace(tmp_file, os.path.join(path, level_file))
+
+
+def build_pyramid(record_name, channel=0, directory=None, base_level=4, min_bins=1024, block_samples=BLOCK_SAMPLES):
+    """
+    Precompute the min/max pyramid of one channel of a WFDB record.
+
+    Level k holds the min and max of every 2**k samples as a (ceil(n / 2**k), 2) float32 .npy.
+    The first level, base_level, is built from the record in blocks and every further level from
+    the one below, so memory stays at one block however long the record is. Levels stop once a
+    level has at most min_bins bins. Finer zoom is read from the record itself, at most
+    2**base_level samples per pixel. Missing samples (NaN) are ignored, all-missing bins stay NaN.
+    # Returns
+        the pyramid directory
+    """
+    record = open_wfdb_record(record_name)
+    path = pyramid_dir(record_name, channel, directory)
+    os.makedirs(path, exist_ok=True)
+    # An existing pyramid is invalid until its meta file is written again
+    if os.path.exists(os.path.join(path, META_FILE)):
+        os.remove(os.path.join(path, META_FILE))
+    for level_file in os.listdir(path):
+        if level_file.startswith('level'):
+            os.remove(os.path.join(path, level_file))
+
+    n = record.num_samples
+    block_samples = max(block_samples >> base_level, 1) << base_level
+    blocks = (_reduce_bins(signal, signal, 1 << base_level)
+              for signal in (record.physical(channel, start, min(start + block_samples, n)).astype(np.float32) for start in range(0, n, block_samples)))
+    level, length = base_level, -(-n >> base_level)
+    _save_level(path, f"level{level}.npy", length, blocks)
+    while length > min_bins:
+        below = np.load(os.path.join(path, f"level{level}.npy"), mmap_mode='r')
+        blocks = (_reduce_bins(rows[:, 0], rows[:, 1], 2)
+                  for rows in (np.asarray(below[start:start + block_samples]) for start in range(0, len(below), block_samples)))
+        level, length = level + 1, -(-length // 2)
+        _save_level(path, f"level{level}.npy", length, blocks)
+        del below
+
+    meta = {'record': os.path.abspath(record_name), 'channel': channel, 'fs': record.fs, 'num_samples': n,
+            'base_level': base_level, 'top_level': level, 'source': _source_stat(record_name)}
+    tmp_file = os.path.join(path, f"{META_FILE}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_file, os.path.join(path, META_FILE))
+    return path
+
+
+class SignalPyramid:
+    """Memory-mapped min/max pyramid of one channel of a record, see build_pyramid().
+
+    window() answers any (start, end, pixel_width) from the coarsest level that still has a bin
+    per pixel, so it reads at most about 2 * pixel_width bins whatever the window length; windows
+    under 2**base_level samples per pixel are read from the record itself.
+    """
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE), 'r') as f:
+            meta = json.load(f)
+        self.path = path
+        self.record_name = meta['record']
+        self.channel = meta['channel']
+        self.fs = meta['fs']
+        self.num_samples = meta['num_samples']
+        self.source = meta['source']
+        self.base_level = meta['base_level']
+        self.levels = {level: np.load(os.path.join(path, f"level{level}.npy"), mmap_mode='r') for level in range(self.base_level, meta['top_level'] + 1)}
+        self.top_level = meta['top_level']
+
+    def is_stale(self):
+        """True when the record changed since the pyramid was built."""
+        return self.source != _source_stat(self.record_name)
+
+    def window(self, start_sec, end_sec, pixel_width):
+        """
+        Min/max envelope of [start_sec, end_sec) for a plot pixel_width pixels wide.
+        # Returns
+            signal, sample_rate, signal_start_sec: min, max, min, max, ... of the bins (the samples themselves
+            when zoomed in far enough), the rate of those values and the time of the first one; can be passed
+            to plot_1() or plot_single_channel_ekg_30sec() as ecg and sample_rate.
+        """
+        idx_start = min(max(int(start_sec * self.fs), 0), self.num_samples)
+        idx_end = min(max(int(np.ceil(end_sec * self.fs)), idx_start), self.num_samples)
+        pixel_width = max(int(pixel_width), 1)
+        samples_per_pixel = (idx_end - idx_start) / pixel_width
+        level = min(int(np.log2(samples_per_pixel)) if samples_per_pixel >= 1 else 0, self.top_level)
+        if level < self.base_level:
+            record = open_wfdb_record(self.record_name)
+            return record.physical(self.channel, idx_start, idx_end), self.fs, idx_start / self.fs
+
+        bin_start, bin_end = idx_start >> level, -(-idx_end // (1 << level))
+        bins = np.asarray(self.levels[level][bin_start:bin_end])
+        # Zoomed out past the top level, merge its bins here, there are at most min_bins of them
+        factor = 1
+        if level == self.top_level and len(bins) > 2 * pixel_width:
+            factor = int(np.ceil(len(bins) / (2 * pixel_width)))
+            padded = np.full((-(-len(bins) // factor) * factor, 2), np.nan, dtype=bins.dtype)
+            padded[:len(bins)] = bins
+            padded = padded.reshape(-1, factor, 2)
+            bins = np.stack([np.fmin.reduce(padded[:, :, 0], axis=1), np.fmax.reduce(padded[:, :, 1], axis=1)], axis=1)
+        bin_samples = factor << level
+        return bins.reshape(-1), 2.0 * self.fs / bin_samples, bin_start * (1 << level) / self.fs
+
+
+_pyramids = {}
+def open_pyramid(record_name, channel=0, directory=None, build=True):
+    """Cached SignalPyramid of a record channel, built (or rebuilt when the record changed) if build is set."""
+    path = pyramid_dir(record_name, channel, directory)
+    key = os.path.abspath(path)
+    pyramid = _pyramids.get(key)
+    if pyramid is None and os.path.exists(os.path.join(path, META_FILE)):
+        pyramid = SignalPyramid(path)
+    if pyramid is None or pyramid.is_stale():
+        if not build:
+            raise FileNotFoundError(f"No up to date pyramid for {record_name} channel {channel} in {path}")
+        pyramid = SignalPyramid(build_pyramid(record_name, channel, directory))
+    _pyramids[key] = pyramid
+    return pyramid
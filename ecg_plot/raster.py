@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+
+import struct
+import zlib
+import numpy as np
+from math import ceil
+from .ecg_plot import _fit_length
+
+DEFAULT_PATH = './'
+
+# Same geometry as a default matplotlib figure with one subplot, see ChartTemplate
+AXES_POSITION = (0.125, 0.11, 0.9, 0.88)   # left, bottom, right, top in figure fraction
+LINE_COLOR = {None: (31, 119, 180), 'bw': (0, 0, 0)}
+GRID_COLOR = {
+    None: ((255, 0, 0), (255, 178.5, 178.5)),       # major, minor
+    'bw': ((102, 102, 102), (191.25, 191.25, 191.25)),
+    }
+SPINE_COLOR = (0, 0, 0)
+
+
+def _axis_lines_alpha(size, positions, width):
+    """Coverage along one image axis of lines (px positions, continuous) with the given width."""
+    alpha = np.zeros(size)
+    for pos in positions:
+        lo, hi = pos - width / 2, pos + width / 2
+        first, last = max(int(np.floor(lo)), 0), min(int(np.ceil(hi)), size)
+        if first >= last:
+            continue
+        pixels = np.arange(first, last)
+        cover = np.clip(np.minimum(pixels + 1, hi) - np.maximum(pixels, lo), 0, 1)
+        alpha[first:last] = np.maximum(alpha[first:last], cover)
+    return alpha
+
+
+def _blend(image, alpha, color):
+    alpha = alpha[..., None]
+    image *= 1 - alpha
+    image += alpha * np.asarray(color, dtype=np.float32)
+
+
+class _RasterLayout:
+    def __init__(self, secs, amplitude_ecg, figsize, dpi, time_ticks, style):
+        self.width, self.height = int(round(figsize[0] * dpi)), int(round(figsize[1] * dpi))
+        left, bottom, right, top = AXES_POSITION
+        # Image rows run top down, matplotlib display y runs bottom up
+        self.x0, self.x1 = left * self.width, right * self.width
+        self.y0, self.y1 = (1 - top) * self.height, (1 - bottom) * self.height
+        self.secs = secs
+        self.amplitude_ecg = amplitude_ecg
+        self.dpi = dpi
+        self.time_ticks = time_ticks
+        self.style = style
+        self.background = self._draw_grid()
+
+    def to_pixels(self, t, v):
+        x = self.x0 + t / self.secs * (self.x1 - self.x0)
+        y = self.y0 + (self.amplitude_ecg - v) / (2 * self.amplitude_ecg) * (self.y1 - self.y0)
+        return x, y
+
+    def _draw_grid(self):
+        image = np.full((self.height, self.width, 3), 255, dtype=np.float32)
+        grid_width = 0.5 * self.dpi / 72
+        major_color, minor_color = GRID_COLOR[self.style]
+
+        # 1 grid major per time_ticks seconds and 1 mV, 5 minor divisions, as in _ax_plot_30
+        t_major = np.arange(0, self.secs + 1e-9, self.time_ticks)
+        t_minor = np.setdiff1d(np.round(np.arange(0, self.secs + 1e-9, self.time_ticks / 5), 9), np.round(t_major, 9))
+        v_major = np.arange(-ceil(self.amplitude_ecg), ceil(self.amplitude_ecg), 1.0)
+        v_major = v_major[np.abs(v_major) <= self.amplitude_ecg]
+        v_minor = np.arange(-ceil(self.amplitude_ecg), ceil(self.amplitude_ecg) + 1e-9, 0.2)
+        v_minor = v_minor[(np.abs(v_minor) <= self.amplitude_ecg) & (np.abs(v_minor - np.round(v_minor)) > 1e-9)]
+
+        rows = slice(int(self.y0), int(ceil(self.y1)))
+        cols = slice(int(self.x0), int(ceil(self.x1)))
+        for times, values, color in [(t_major, v_major, major_color), (t_minor, v_minor, minor_color)]:
+            x, _ = self.to_pixels(times, 0)
+            _, y = self.to_pixels(0, values)
+            alpha_x = _axis_lines_alpha(self.width, x, grid_width)[cols]
+            alpha_y = _axis_lines_alpha(self.height, y, grid_width)[rows]
+            _blend(image[rows, cols], np.broadcast_to(alpha_x, (alpha_y.size, alpha_x.size)), color)
+            _blend(image[rows, cols], np.broadcast_to(alpha_y[:, None], (alpha_y.size, alpha_x.size)), color)
+        self._draw_spines(image)
+        return np.round(image).astype(np.uint8)
+
+    def _draw_spines(self, image):
+        spine_width = 0.8 * self.dpi / 72
+        x = _axis_lines_alpha(self.width, [self.x0, self.x1], spine_width)
+        y = _axis_lines_alpha(self.height, [self.y0, self.y1], spine_width)
+        inside_x = (np.arange(self.width) >= self.x0 - spine_width / 2) & (np.arange(self.width) <= self.x1 + spine_width / 2)
+        inside_y = (np.arange(self.height) >= self.y0 - spine_width / 2) & (np.arange(self.height) <= self.y1 + spine_width / 2)
+        _blend(image, np.maximum(x[None, :] * inside_y[:, None], y[:, None] * inside_x[None, :]), SPINE_COLOR)
+        # The trace is clipped to the area the spines leave uncovered
+        self.clip_x = (int(ceil(self.x0 + spine_width / 2)), int(self.x1 - spine_width / 2))
+        self.clip_y = (int(ceil(self.y0 + spine_width / 2)), int(self.y1 - spine_width / 2))
+
+    def draw_trace(self, image, ecg, sample_rate, lwidth):
+        """Anti-aliased polyline of a function of time: every pixel column covers the y range the
+        trace reaches within half a line width of the column centre, widened by half a line width."""
+        t = np.arange(len(ecg)) / sample_rate
+        x, y = self.to_pixels(t, np.asarray(ecg, dtype=np.float64))
+        half = lwidth * self.dpi / 72 / 2
+
+        first, last = max(int(x[0]), self.clip_x[0]), min(int(ceil(x[-1])), self.clip_x[1])
+        if first >= last:
+            return
+        columns = np.arange(first, last)
+        centres = columns + 0.5
+
+        # y range within [centre - half, centre + half]: interpolated window edges and the samples inside
+        left, right = np.interp(centres - half, x, y), np.interp(centres + half, x, y)
+        lo, hi = np.minimum(left, right), np.maximum(left, right)
+        reach = int(ceil(half)) + 1
+        for k in range(-reach, reach + 1):
+            col = np.floor(x).astype(np.int64) + k
+            keep = (np.abs(x - (col + 0.5)) <= half) & (col >= first) & (col < last)
+            np.minimum.at(lo, col[keep] - first, y[keep])
+            np.maximum.at(hi, col[keep] - first, y[keep])
+        top, bottom = lo - half, hi + half
+
+        # One entry per covered pixel, coverage is the overlap of the pixel row with [top, bottom]
+        row_first = np.clip(np.floor(top).astype(np.int64), self.clip_y[0], self.clip_y[1])
+        row_last = np.clip(np.ceil(bottom).astype(np.int64), self.clip_y[0], self.clip_y[1])
+        counts = row_last - row_first
+        index = np.repeat(np.arange(columns.size), counts)
+        rows = np.repeat(row_first, counts) + np.arange(index.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        alpha = np.clip(np.minimum(rows + 1, bottom[index]) - np.maximum(rows, top[index]), 0, 1)[:, None]
+
+        cols = columns[index]
+        color = np.asarray(LINE_COLOR[self.style], dtype=np.float32)
+        image[rows, cols] = np.round(image[rows, cols] * (1 - alpha) + color * alpha).astype(np.uint8)
+
+    def crop(self, image, layout):
+        if layout != 'tight':
+            return image
+        pad = int(round(0.1 * self.dpi))
+        top, bottom = max(int(self.y0) - pad, 0), min(int(ceil(self.y1)) + pad, self.height)
+        left, right = max(int(self.x0) - pad, 0), min(int(ceil(self.x1)) + pad, self.width)
+        return image[top:bottom, left:right]
+
+
+_raster_layouts = {}
+def _raster_layout(secs, amplitude_ecg, figsize, dpi, time_ticks, style):
+    key = (secs, amplitude_ecg, tuple(figsize), dpi, time_ticks, style)
+    if key not in _raster_layouts:
+        _raster_layouts[key] = _RasterLayout(secs, amplitude_ecg, figsize, dpi, time_ticks, style)
+    return _raster_layouts[key]
+
+
+def plot_single_channel_ekg_30sec_raster(ecg, sample_rate=240, secs=30, lwidth=0.5, amplitude_ecg=1.8, time_ticks=1.0, figsize=(20, 4), dpi=300, style=None, layout=None):
+    """Draw a single lead strip straight into an RGB image, without matplotlib.
+    Same calibration as plot_single_channel_ekg_30sec(): axes placement, time and mV grid, line width.
+    Tick labels are not drawn.
+    # Arguments
+        ecg          : single lead ECG signal
+        sample_rate  : Sample rate of the signal.
+        secs         : seconds shown on the chart, longer signals are truncated and shorter ones zero-padded
+        lwidth       : line width in points
+        amplitude_ecg: y axis range in mV, from -amplitude_ecg to amplitude_ecg
+        time_ticks   : major time grid in seconds
+        figsize      : image size in inches
+        dpi          : dots per inch (dpi) of the image
+        style        : display style, defaults to None, can be 'bw' which means black white
+        layout       : Set equal to "tight" to crop the image to the chart
+    """
+    raster = _raster_layout(secs, amplitude_ecg, figsize, dpi, time_ticks, style)
+    num_samples = int(secs * sample_rate)
+    ecg = _fit_length(np.asarray(ecg), num_samples)
+
+    image = raster.background.copy()
+    if num_samples > 1:
+        # The matplotlib chart spreads the samples over np.linspace(0, secs, num_samples)
+        raster.draw_trace(image, ecg, (num_samples - 1) / secs, lwidth)
+    return raster.crop(image, layout)
+
+
+def _png_chunk(tag, data):
+    chunk = tag + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+
+def encode_png(image, compress_level=6, dpi=None):
+    """Encode an 8 bit RGB or RGBA image as PNG bytes, rows use the 'Up' filter which suits ECG grids."""
+    height, width, channels = image.shape
+    color_type = {3: 2, 4: 6}[channels]
+    rows = image.reshape(height, width * channels)
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:], dtype=np.uint8, casting='unsafe')
+
+    png = b'\x89PNG\r\n\x1a\n'
+    png += _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+    if dpi:
+        ppm = int(round(dpi / 0.0254))
+        png += _png_chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+    png += _png_chunk(b'IDAT', zlib.compress(filtered.tobytes(), compress_level))
+    png += _png_chunk(b'IEND', b'')
+    return png
+
+
+def save_raster_as_png(image, file_name, path = DEFAULT_PATH, compress_level=1, dpi=300):
+    """Save an image from plot_single_channel_ekg_30sec_raster().
+    # Arguments
+        image         : RGB image
+        file_name     : file_name
+        path          : path to save image, defaults to current folder
+        compress_level: zlib level, defaults to 1 (fastest), 9 is smallest
+        dpi           : dots per inch (dpi) stored in the file
+    """
+    with open(path + file_name + '.png', 'wb') as f:
+        f.write(encode_png(image, compress_level, dpi))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+import time
+import numpy as np
+from .filters import FilterBank
+from .streaming_qrs import StreamingQRSDetector
+
+
+def detect_rpeaks(signal, fs=250, tolerance=0.05):
+    """R-peaks of a whole recording, without the templates and heart rate biosppy.ecg.ecg() also computes.
+
+    QRS complexes are found by StreamingQRSDetector fed the recording as one chunk (band-pass,
+    derivative, integration and adaptive thresholds), then each R-peak is moved to the maximum
+    of the 3-45 Hz zero-phase band-passed signal within +-tolerance seconds, as biosppy does.
+    # Arguments
+        signal   : 1-D EKG, NaN samples (WFDB invalid) are treated as 0
+        fs       : sampling frequency in Hz
+        tolerance: R-peak correction window in seconds
+    # Returns
+        sorted unique int64 array of R-peak sample indices
+    """
+    signal = np.nan_to_num(np.asarray(signal, dtype=np.float64))
+    if len(signal) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    detector = StreamingQRSDetector(fs)
+    qrs = np.concatenate([detector.process(signal), detector.flush()])
+    if len(qrs) == 0:
+        return qrs
+
+    filtered = FilterBank(fs).bandpass(signal, 3, 45, order=4)
+    tol = int(tolerance * fs)
+    lo = np.clip(qrs - tol, 0, len(signal) - 1)
+    hi = np.clip(qrs + tol, 1, len(signal))
+    # argmax over every correction window at once, windows near the edges are shorter
+    offsets = np.arange(2 * tol)
+    windows = np.minimum(lo[:, None] + offsets[None, :], hi[:, None] - 1)
+    rpeaks = windows[np.arange(len(qrs)), np.argmax(filtered[windows], axis=1)]
+    return np.unique(rpeaks).astype(np.int64)
+
+
+def detect_segment_rpeaks(signal, segments, fs=250):
+    """R-peaks of many segments of one recording, detected per run of adjacent segments.
+
+    Adjacent segments are joined so detection runs over whole clean stretches of the recording
+    instead of restarting (and re-learning its thresholds) every segment.
+    # Arguments
+        signal  : 1-D EKG of the whole recording
+        segments: list of (start, end) sample ranges, sorted and not overlapping
+    # Returns
+        list of R-peak arrays, one per segment, indices relative to the segment start
+    """
+    rpeaks = [None] * len(segments)
+    i = 0
+    while i < len(segments):
+        j = i
+        while j + 1 < len(segments) and segments[j + 1][0] == segments[j][1]:
+            j += 1
+        run_start, run_end = segments[i][0], segments[j][1]
+        run_peaks = detect_rpeaks(signal[run_start:run_end], fs) + run_start
+        for k in range(i, j + 1):
+            start, end = segments[k]
+            lo, hi = np.searchsorted(run_peaks, [start, end])
+            rpeaks[k] = run_peaks[lo:hi] - start
+        i = j + 1
+    return rpeaks
+
+
+def compare_rpeaks(reference, test, fs=250, tolerance=0.05):
+    """Agreement of two R-peak sets: a peak matches when one of the other set is within tolerance seconds.
+    # Returns
+        dict with reference/test counts, sensitivity, ppv and the mean |offset| in ms of matched peaks
+    """
+    reference, test = np.asarray(reference), np.asarray(test)
+    result = {'reference': len(reference), 'test': len(test), 'sensitivity': np.nan, 'ppv': np.nan, 'offset_ms': np.nan}
+    if len(reference) == 0 or len(test) == 0:
+        return result
+
+    def nearest(peaks, other):
+        index = np.clip(np.searchsorted(other, peaks), 1, len(other) - 1) if len(other) > 1 else np.zeros(len(peaks), dtype=int)
+        distance = np.abs(peaks - other[index])
+        if len(other) > 1:
+            distance = np.minimum(distance, np.abs(peaks - other[index - 1]))
+        return distance
+
+    ref_distance = nearest(reference, np.sort(test))
+    matched = ref_distance <= tolerance * fs
+    result['sensitivity'] = matched.mean()
+    result['ppv'] = np.mean(nearest(test, np.sort(reference)) <= tolerance * fs)
+    if matched.any():
+        result['offset_ms'] = ref_distance[matched].mean() / fs * 1000
+    return result
+
+
+def biosppy_rpeaks(segment, fs=250):
+    """R-peaks of one segment through the full biosppy pipeline, the reference for detect_rpeaks()."""
+    from biosppy.signals import ecg
+    return np.asarray(ecg.ecg(segment, fs, show=False)[2], dtype=np.int64)
+
+
+def benchmark(signal, segments, fs=250):
+    """Time detect_segment_rpeaks() against biosppy_rpeaks() per segment and compare their R-peaks."""
+    t0 = time.perf_counter()
+    native = detect_segment_rpeaks(signal, segments, fs)
+    t1 = time.perf_counter()
+    reference = [biosppy_rpeaks(signal[start:end], fs) for start, end in segments]
+    t2 = time.perf_counter()
+    agreement = compare_rpeaks(np.concatenate([peaks + start for peaks, (start, _) in zip(reference, segments)] or [np.zeros(0, dtype=np.int64)]),
+                               np.concatenate([peaks + start for peaks, (start, _) in zip(native, segments)] or [np.zeros(0, dtype=np.int64)]),
+                               fs)
+    agreement.update({'native_seconds': t1 - t0, 'biosppy_seconds': t2 - t1, 'speedup': (t2 - t1) / max(t1 - t0, 1e-9)})
+    return native, reference, agreement
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+import os
+import time
+import logging
+import multiprocessing
+from collections import OrderedDict
+from itertools import groupby
+import numpy as np
+from .ecg_plot import chart_template, plot_single_channel_ekg_30sec, save_as_png
+from .montage import MontageWriter
+from .image_writer import AsyncImageWriter
+from .raster import plot_single_channel_ekg_30sec_raster, save_raster_as_png
+from .wfdb_reader import open_wfdb_record
+
+
+def read_segment_list(segment_list_file):
+    """(record, onset, offset) of every line of a step4/step5 segment list, onset and offset in seconds."""
+    segments = []
+    with open(segment_list_file, 'r') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record_name, onset_str, offset_str = line.strip().split(',')
+            segments.append((record_name, int(onset_str), int(offset_str)))
+    return segments
+
+
+def chunk_segments(record_name, onset, offset, chunk_size=30):
+    """(record, start, end) of each chunk_size second chunk within a segment."""
+    return [(record_name, start, min(start + chunk_size, offset)) for start in range(onset, offset, chunk_size)]
+
+
+def group_by_record(segments, chunk_size=30):
+    """Chunks of all segments grouped by record, in first-seen record order: {record: [(onset, offset, [(start, end), ...])]}."""
+    groups = OrderedDict()
+    for record_name, onset, offset in segments:
+        chunks = [(start, end) for _, start, end in chunk_segments(record_name, onset, offset, chunk_size)]
+        groups.setdefault(record_name, []).append((onset, offset, chunks))
+    return groups
+
+
+class SegmentRenderer:
+    """Renders the 30 second chunks of segment lists, each record is opened once and each segment read in one window.
+
+    Chunks are sliced out of the segment window exactly as ecg_plot1_ekg_30sec_cli.py reads them
+    (end clamped to the last sample but one), and drawn on one cached chart template per process,
+    so the PNGs match what the per-chunk CLI produced.
+    # Arguments
+        channel    : channel of the records to plot
+        output_dir : directory for the images, defaults to the current folder
+        engine     : 'template' (matplotlib chart reused between chunks), 'raster' (no matplotlib,
+                     no tick labels) or None (a new matplotlib figure per chunk)
+        sample_rate: sample rate the chart is drawn at
+        chunk_size : seconds per image
+        writer_threads: with threads > 0 the images are encoded and written by an AsyncImageWriter
+                     while the next chunk is drawn
+        image_format: 'png', 'webp' or 'jpg' for the AsyncImageWriter, PNGs then use zlib level 1
+    """
+    def __init__(self, channel=0, output_dir=None, engine='template', sample_rate=240, chunk_size=30, writer_threads=0, image_format='png'):
+        self.channel = channel
+        self.path = os.path.join(output_dir, '') if output_dir else './'
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.writer_threads = writer_threads
+        self.image_format = image_format
+
+    def _submit(self, writer, ekg_signal, output_file):
+        if self.engine == 'template':
+            template = chart_template(sample_rate=self.sample_rate)
+            template.plot(ekg_signal)
+            return writer.submit(template.render(), output_file, self.path)
+        if self.engine == 'raster':
+            image = plot_single_channel_ekg_30sec_raster(ekg_signal, sample_rate=self.sample_rate, layout='tight')
+            return writer.submit(image, output_file, self.path)
+        plot_single_channel_ekg_30sec(ekg_signal, sample_rate=self.sample_rate)
+        return writer.submit_figure(output_file, self.path)
+
+    def _save(self, ekg_signal, output_file):
+        if self.engine == 'template':
+            template = chart_template(sample_rate=self.sample_rate)
+            template.plot(ekg_signal)
+            template.save_as_png(output_file, self.path)
+        elif self.engine == 'raster':
+            image = plot_single_channel_ekg_30sec_raster(ekg_signal, sample_rate=self.sample_rate, layout='tight')
+            save_raster_as_png(image, output_file, self.path)
+        else:
+            plot_single_channel_ekg_30sec(ekg_signal, sample_rate=self.sample_rate)
+            save_as_png(output_file, self.path)
+        return os.path.join(self.path, f"{output_file}.png")
+
+    def render_record(self, record_name, segments):
+        """
+        Render the chunks of one record's segments.
+        # Arguments
+            segments: list of (onset, offset, [(start, end), ...]) in seconds
+        # Returns
+            list of (record, start, end, png file, error), errors are reported, not raised
+        """
+        results = []
+        try:
+            record = open_wfdb_record(record_name)
+        except Exception as e:
+            return [(record_name, start, end, None, str(e).strip()) for _, _, chunks in segments for start, end in chunks]
+
+        writer = AsyncImageWriter(self.writer_threads, image_format=self.image_format) if self.writer_threads > 0 else None
+        fs, last = record.fs, record.num_samples - 1
+        for onset, offset, chunks in segments:
+            try:
+                # One read for the whole segment, chunks are views into it
+                window_start = max(int(onset * fs), 0)
+                window = record.physical(self.channel, window_start, max(min(int(offset * fs), last), window_start))
+            except Exception as e:
+                results.extend((record_name, start, end, None, str(e).strip()) for start, end in chunks)
+                continue
+            for start, end in chunks:
+                try:
+                    idx_start = max(int(start * fs), 0)
+                    idx_end = min(int(end * fs), last)
+                    ekg_signal = window[idx_start - window_start:max(idx_end - window_start, 0)]
+                    output_file = f"{os.path.basename(record_name)}_{start}_{end}"
+                    if writer is None:
+                        results.append((record_name, start, end, self._save(ekg_signal, output_file), None))
+                    else:
+                        results.append((record_name, start, end, self._submit(writer, ekg_signal, output_file), None))
+                except Exception as e:
+                    results.append((record_name, start, end, None, str(e).strip()))
+        if writer is None:
+            return results
+
+        # Wait for the queued images, encoding and write errors are reported per chunk like drawing errors
+        writer.wait()
+        resolved = []
+        for record_name, start, end, future, error in results:
+            if future is not None:
+                try:
+                    future = future.result()
+                except Exception as e:
+                    future, error = None, str(e).strip()
+            resolved.append((record_name, start, end, future, error))
+        return resolved
+
+    def render(self, segments, workers=1):
+        """
+        Render every chunk of segments, a list of (record, onset, offset), one task per record.
+
+        With workers > 1 the records are spread over a process pool, every process builds its own
+        chart template. Results come back in record order either way.
+        """
+        groups = list(group_by_record(segments, self.chunk_size).items())
+        if workers <= 1 or len(groups) <= 1:
+            return [result for record_name, record_segments in groups for result in self.render_record(record_name, record_segments)]
+        with multiprocessing.Pool(min(workers, len(groups))) as pool:
+            results = pool.starmap(self.render_record, groups, chunksize=1)
+        return [result for record_results in results for result in record_results]
+
+
+    def montage(self, segments, output_file, **kwargs):
+        """
+        Write every chunk of segments as strips of one montage (a multi-page PDF or PNG sheets, see MontageWriter),
+        titled '<record> <start>-<end> s', in segment list order. Each record is opened once per run of consecutive segments of it.
+        # Returns
+            (written files, list of (record, start, end, error) of the chunks that could not be read)
+        """
+        errors = []
+        with MontageWriter(output_file, secs=self.chunk_size, sample_rate=self.sample_rate, **kwargs) as writer:
+            for record_name, run in groupby(segments, key=lambda segment: segment[0]):
+                chunks = [chunk for _, onset, offset in run for chunk in chunk_segments(record_name, onset, offset, self.chunk_size)]
+                try:
+                    record = open_wfdb_record(record_name)
+                except Exception as e:
+                    errors.extend((record_name, start, end, str(e).strip()) for _, start, end in chunks)
+                    continue
+                fs, last = record.fs, record.num_samples - 1
+                for _, start, end in chunks:
+                    try:
+                        ekg_signal = record.physical(self.channel, max(int(start * fs), 0), min(int(end * fs), last))
+                        writer.add(ekg_signal, f"{os.path.basename(record_name)} {start}-{end} s")
+                    except Exception as e:
+                        errors.append((record_name, start, end, str(e).strip()))
+        return writer.files, errors
+
+
+def render_segment_list(segment_list_file, channel=0, output_dir=None, engine='template', workers=1, montage=None,
+                        writer_threads=0, image_format='png'):
+    """
+    Render all chunks of a segment list file and log the timing, returns the render() results.
+    With montage set to a .pdf or .png file name, the chunks are written as strips of that montage instead, returns its files.
+    """
+    segments = read_segment_list(segment_list_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    if montage:
+        files, errors = SegmentRenderer(channel, output_dir).montage(segments, os.path.join(output_dir or '', montage))
+        elapsed = time.perf_counter() - t0
+        for record_name, start, end, error in errors:
+            logging.error(f"Error plotting {record_name} {start}-{end}: {error}")
+        logging.info(f"Wrote {len(segments)} segments to {len(files)} montage file(s) in {elapsed:.2f}s: {', '.join(files)}")
+        return files
+    results = SegmentRenderer(channel, output_dir, engine, writer_threads=writer_threads, image_format=image_format).render(segments, workers)
+    elapsed = time.perf_counter() - t0
+    failed = [result for result in results if result[4] is not None]
+    for record_name, start, end, _, error in failed:
+        logging.error(f"Error plotting {record_name} {start}-{end}: {error}")
+    logging.info(f"Rendered {len(results) - len(failed)}/{len(results)} chunks of {len(segments)} segments in {elapsed:.2f}s"
+                 f" ({elapsed / max(len(results), 1):.3f}s per chunk)")
+    return results
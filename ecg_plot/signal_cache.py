@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+import os
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+
+
+def file_digest(file_name, block_size=1 << 20):
+    """blake2b of the file content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SignalCache:
+    """On-disk cache of decoded signals, one .npy per array so hits open with mmap.
+
+    Entries are keyed by the content hash of the source files and a tag naming the decoder,
+    the hash of a source is recomputed only when its path, mtime or size changes.
+    The least recently used entries are evicted once the cache grows past max_bytes.
+    Arrays go through a temporary file and os.replace, and every index update is a read-modify-write
+    under an flock on index.lock, so processes can share a cache dir. Decoding and storing a miss
+    happen outside the lock. Without fcntl (Windows) the index is not locked, use one cache dir per process there.
+    """
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock on the index between processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.cache_dir, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'sources': {}, 'entries': {}}
+
+    def _write_index(self, index):
+        index_file = os.path.join(self.cache_dir, INDEX_FILE)
+        tmp_file = f"{index_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_file, index_file)
+
+    def _source_hash(self, index, source_file):
+        stat = os.stat(source_file)
+        path = os.path.abspath(source_file)
+        known = index['sources'].get(path)
+        if known and known['mtime_ns'] == stat.st_mtime_ns and known['size'] == stat.st_size:
+            return known['hash']
+        content_hash = file_digest(source_file)
+        index['sources'][path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': content_hash}
+        return content_hash
+
+    def key(self, source_files, tag, index=None):
+        """Cache key of a decoder (tag) applied to one or more source files."""
+        index = self._read_index() if index is None else index
+        hashes = [self._source_hash(index, source_file) for source_file in source_files]
+        return hashlib.blake2b('/'.join([tag] + hashes).encode(), digest_size=16).hexdigest()
+
+    def _load(self, entry_dir, names):
+        try:
+            return {name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode='r') for name in names}
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, entry_dir, arrays):
+        os.makedirs(entry_dir, exist_ok=True)
+        size = 0
+        for name, array in arrays.items():
+            array_file = os.path.join(entry_dir, f"{name}.npy")
+            tmp_file = f"{array_file}.{os.getpid()}.tmp.npy"
+            np.save(tmp_file, np.asarray(array))
+            os.replace(tmp_file, array_file)
+            size += os.path.getsize(array_file)
+        return size
+
+    def _evict(self, index, keep):
+        total = sum(entry['bytes'] for entry in index['entries'].values())
+        for key in sorted(index['entries'], key=lambda key: index['entries'][key]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry_dir = os.path.join(self.cache_dir, key)
+            for name in index['entries'][key]['arrays']:
+                try:
+                    os.remove(os.path.join(entry_dir, f"{name}.npy"))
+                except OSError:
+                    pass
+            try:
+                os.rmdir(entry_dir)
+            except OSError:
+                pass
+            total -= index['entries'].pop(key)['bytes']
+
+    def get_or_load(self, source_files, tag, loader):
+        """Return the cached arrays of loader() for these sources, calling loader() on a miss.
+        # Arguments
+            source_files: file or list of files the arrays are decoded from
+            tag         : name of the decoder and its options, part of the key
+            loader      : function returning a dict of name -> array
+        # Returns
+            dict of name -> array, read-only memory maps on a hit
+        """
+        source_files = [source_files] if isinstance(source_files, str) else list(source_files)
+        # Hash the sources without holding the lock, the known hashes are merged into the index below
+        unlocked_index = self._read_index()
+        key = self.key(source_files, tag, unlocked_index)
+        sources = {path: unlocked_index['sources'][path] for path in map(os.path.abspath, source_files)}
+        entry_dir = os.path.join(self.cache_dir, key)
+
+        with self._locked():
+            index = self._read_index()
+            index['sources'].update(sources)
+            entry = index['entries'].get(key)
+            arrays = self._load(entry_dir, entry['arrays']) if entry else None
+            if arrays is not None:
+                self._touch(index, key)
+                return arrays
+
+        # Miss: decode and store outside the lock, entries are content addressed so a
+        # concurrent store of the same key writes the same files
+        arrays = loader()
+        size = self._store(entry_dir, arrays)
+        with self._locked():
+            index = self._read_index()
+            index['sources'].update(sources)
+            index['entries'][key] = {'arrays': list(arrays), 'bytes': size, 'tag': tag}
+            self._touch(index, key)
+        return arrays
+
+    def _touch(self, index, key):
+        """Mark key as used, evict down to max_bytes and write the index, called with the lock held."""
+        index['entries'][key]['last_used'] = time.time()
+        self._evict(index, keep=key)
+        self._write_index(index)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+
+import time
+import argparse
+import numpy as np
+from scipy.signal import sosfilt, sosfilt_zi, sos2tf, lfilter, find_peaks, group_delay
+from .filters import butter_sos
+
+
+class StreamingQRSDetector:
+    """Pan-Tompkins QRS detector for a signal that arrives in chunks of any size.
+
+    The 5-15 Hz band-pass, derivative, squaring and moving window integration are causal
+    filters whose state is carried between chunks. Integrator peaks are classified against
+    adaptive signal/noise levels (SPKI/NPKI) with a search-back for missed beats, and the
+    R-peak is located on the band-passed signal, corrected for the filter delay.
+
+    A beat is emitted once the refractory period after its integrator peak has been seen,
+    so latency is about integration window + refractory period (~0.35 s at the defaults);
+    beats recovered by search-back come out after at most 1.66 average RR intervals.
+
+    Missing samples (NaN or inf, e.g. wearable dropouts or WFDB -32768 read through wfdb_reader)
+    hold the last finite value, so a gap never reaches the filter states.
+    """
+    def __init__(self, fs=250, lowcut=5, highcut=15, order=2, integration_window=0.15, refractory=0.2, learning_period=2.0):
+        self.fs = fs
+        self.sos = butter_sos(fs, (lowcut, highcut), order)
+        self.window = max(int(integration_window * fs), 1)
+        self.refractory = int(refractory * fs)
+        self.learning_samples = int(learning_period * fs)
+        self.max_history = max(int(5 * fs), self.learning_samples)
+
+        # Filter states, one per stage
+        self.last_finite = None      # held over missing samples, across chunks
+        self.bandpass_zi = None
+        self.derivative = np.array([1, 2, 0, -2, -1]) * (fs / 8.0)
+        self.derivative_zi = np.zeros(len(self.derivative) - 1)
+        self.integrator_zi = np.zeros(self.window - 1)
+
+        # Delay of the band-pass + derivative at the QRS centre frequency, to place R-peaks
+        b, a = sos2tf(self.sos)
+        self.delay = int(round(group_delay((b, a), [(lowcut + highcut) / 2.0], fs=fs)[1][0])) + (len(self.derivative) - 1) // 2
+
+        # History of band-passed and integrated samples, history[0] is sample self.offset
+        self.offset = 0
+        self.bandpassed = np.zeros(0)
+        self.integrated = np.zeros(0)
+        self.samples_seen = 0
+        self.next_candidate = 0      # integrator peaks before this sample were classified
+
+        # Adaptive levels, initialised from the learning period
+        self.spki = self.npki = None
+        self.rr_average = None
+        self.last_qrs = None         # sample of the last integrator peak accepted as QRS
+        self.noise_peaks = []        # (sample, height) since the last QRS, for search-back
+        self.rpeaks = []
+
+    @property
+    def threshold(self):
+        return self.npki + 0.25 * (self.spki - self.npki)
+
+    def _fill_missing(self, chunk):
+        """Replace non-finite samples by the last finite one; before the first finite sample, by the first one seen."""
+        finite = np.isfinite(chunk)
+        if finite.all():
+            self.last_finite = chunk[-1]
+            return chunk
+        if not finite.any():
+            return np.full(len(chunk), 0.0 if self.last_finite is None else self.last_finite)
+        last = np.maximum.accumulate(np.where(finite, np.arange(len(chunk)), -1))
+        held = self.last_finite if self.last_finite is not None else chunk[np.argmax(finite)]
+        chunk = np.where(last >= 0, chunk[np.maximum(last, 0)], held)
+        self.last_finite = chunk[-1]
+        return chunk
+
+    def _filter(self, chunk):
+        chunk = self._fill_missing(np.asarray(chunk, dtype=np.float64))
+        if self.bandpass_zi is None:
+            self.bandpass_zi = sosfilt_zi(self.sos) * chunk[0]
+        bandpassed, self.bandpass_zi = sosfilt(self.sos, chunk, zi=self.bandpass_zi)
+        derivative, self.derivative_zi = lfilter(self.derivative, 1.0, bandpassed, zi=self.derivative_zi)
+        integrated, self.integrator_zi = lfilter(np.ones(self.window) / self.window, 1.0, derivative ** 2, zi=self.integrator_zi)
+        return bandpassed, integrated
+
+    def _locate_rpeak(self, peak):
+        """R-peak sample for an integrator peak: largest band-passed magnitude in the integration window."""
+        lo = max(peak - self.window - self.offset, 0)
+        hi = peak + 1 - self.offset
+        return self.offset + lo + int(np.argmax(np.abs(self.bandpassed[lo:hi]))) - self.delay
+
+    def _accept(self, peak, height, weight=0.125):
+        self.spki = weight * height + (1 - weight) * self.spki
+        if self.last_qrs is not None:
+            rr = peak - self.last_qrs
+            self.rr_average = rr if self.rr_average is None else 0.125 * rr + 0.875 * self.rr_average
+        self.last_qrs = peak
+        self.noise_peaks = []
+        self.rpeaks.append(max(self._locate_rpeak(peak), 0))
+
+    def _search_back(self, until):
+        """Accept the largest noise peak above half the threshold when no beat came for 1.66 RR."""
+        if self.rr_average is None or self.last_qrs is None or until - self.last_qrs <= 1.66 * self.rr_average:
+            return
+        candidates = [(height, peak) for peak, height in self.noise_peaks if height > 0.5 * self.threshold]
+        if candidates:
+            height, peak = max(candidates)
+            self.noise_peaks = [(p, h) for p, h in self.noise_peaks if p > peak]
+            self._accept(peak, height, weight=0.25)
+
+    def _classify(self, final=False):
+        if self.spki is None:
+            if self.samples_seen < self.learning_samples and not final:
+                return
+            learning = self.integrated[:self.learning_samples]
+            self.spki = 0.25 * learning.max()
+            self.npki = 0.5 * learning.mean()
+
+        # Integrator peaks whose refractory period has been seen completely
+        settled = self.samples_seen if final else self.samples_seen - self.refractory
+        lo = self.next_candidate - self.offset
+        peaks, _ = find_peaks(self.integrated[max(lo - self.refractory, 0):], distance=self.refractory)
+        peaks += self.offset + max(lo - self.refractory, 0)
+        for peak in peaks[(peaks >= self.next_candidate) & (peaks < settled)]:
+            self._search_back(peak)
+            height = self.integrated[peak - self.offset]
+            if self.last_qrs is not None and peak - self.last_qrs < self.refractory:
+                continue
+            if height > self.threshold:
+                self._accept(peak, height)
+            else:
+                self.npki = 0.125 * height + 0.875 * self.npki
+                self.noise_peaks.append((peak, height))
+        self.next_candidate = max(self.next_candidate, settled)
+        self._search_back(settled)
+
+    def _trim(self):
+        """Keep only the history that classification, search-back and R-peak location still need."""
+        if self.spki is None:
+            return
+        keep_from = self.next_candidate - self.refractory - self.window
+        if self.noise_peaks:
+            keep_from = min(keep_from, self.noise_peaks[0][0] - self.window)
+        keep_from = max(keep_from, self.samples_seen - self.max_history, 0)
+        cut = keep_from - self.offset
+        if cut > 0:
+            self.bandpassed = self.bandpassed[cut:]
+            self.integrated = self.integrated[cut:]
+            self.offset = keep_from
+            self.noise_peaks = [(p, h) for p, h in self.noise_peaks if p - self.window >= keep_from]
+
+    def process(self, chunk):
+        """Feed the next samples, returns the R-peak sample indices confirmed by them."""
+        if len(chunk) == 0:
+            return np.zeros(0, dtype=np.int64)
+        emitted = len(self.rpeaks)
+        bandpassed, integrated = self._filter(chunk)
+        self.bandpassed = np.concatenate([self.bandpassed, bandpassed])
+        self.integrated = np.concatenate([self.integrated, integrated])
+        self.samples_seen += len(chunk)
+        self._classify()
+        self._trim()
+        return np.array(self.rpeaks[emitted:], dtype=np.int64)
+
+    def flush(self):
+        """End of stream: classify the integrator peaks still inside their refractory period."""
+        emitted = len(self.rpeaks)
+        if self.samples_seen:
+            self._classify(final=True)
+        return np.array(self.rpeaks[emitted:], dtype=np.int64)
+
+
+def detect_rpeaks_streaming(signal, fs=250, chunk_size=25):
+    """Run StreamingQRSDetector over a whole signal in chunks, returns all R-peak indices."""
+    detector = StreamingQRSDetector(fs)
+    peaks = [detector.process(signal[i:i + chunk_size]) for i in range(0, len(signal), chunk_size)]
+    peaks.append(detector.flush())
+    return np.concatenate(peaks)
+
+
+def synthetic_ecg(seconds, fs=250, seed=0):
+    """Gaussian QRS and T waves at a varying heart rate on wander and noise, with the true R-peaks."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fs)
+    t = np.arange(n) / fs
+    rr = 60.0 / (70 + 10 * np.sin(2 * np.pi * np.arange(int(seconds * 2)) / 60.0) + rng.normal(0, 3, int(seconds * 2)))
+    beats = np.cumsum(rr)
+    beats = beats[beats < seconds - 1]
+    signal = 0.3 * np.sin(2 * np.pi * 0.2 * t) + rng.normal(0, 0.03, n)
+    for beat in beats:
+        lo, hi = int((beat - 0.1) * fs), int((beat + 0.45) * fs)
+        window = t[lo:hi]
+        signal[lo:hi] += np.exp(-0.5 * ((window - beat) / 0.012) ** 2) - 0.15 * np.exp(-0.5 * ((window - beat - 0.03) / 0.01) ** 2)
+        signal[lo:hi] += 0.25 * np.exp(-0.5 * ((window - beat - 0.3) / 0.05) ** 2)
+    return signal, np.round(beats * fs).astype(np.int64)
+
+
+def benchmark(signal, fs=250, chunk_sizes=(1, 25, 250, 2500), truth=None, tolerance=0.05):
+    """Throughput and latency of the streaming detector for several chunk sizes."""
+    results = []
+    for chunk_size in chunk_sizes:
+        detector = StreamingQRSDetector(fs)
+        peaks, latencies = [], []
+        t0 = time.perf_counter()
+        for i in range(0, len(signal), chunk_size):
+            chunk = signal[i:i + chunk_size]
+            found = detector.process(chunk)
+            # Latency: signal seen after the R-peak when the beat is emitted, beats of the
+            # learning period all come out at its end and are left out
+            latencies.extend((i + len(chunk) - found[found >= detector.learning_samples]) / fs)
+            peaks.extend(found)
+        peaks.extend(detector.flush())
+        elapsed = time.perf_counter() - t0
+        result = {'chunk_size': chunk_size, 'seconds': elapsed, 'realtime': len(signal) / fs / elapsed,
+                  'latency_mean': np.mean(latencies), 'latency_max': np.max(latencies), 'beats': len(peaks)}
+        if truth is not None:
+            peaks = np.asarray(peaks)
+            nearest = np.abs(truth[:, None] - peaks[None, :]).min(axis=1) if len(peaks) else np.full(len(truth), np.inf)
+            result['sensitivity'] = np.mean(nearest <= tolerance * fs)
+            result['ppv'] = np.mean(np.abs(peaks[:, None] - truth[None, :]).min(axis=1) <= tolerance * fs) if len(peaks) else 0.0
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the streaming QRS detector.')
+    parser.add_argument('--input', type=str, help='timestamp,value CSV to run on, defaults to a synthetic ECG')
+    parser.add_argument('--fs', type=int, default=250, help='The sampling frequency of the EKG signal')
+    parser.add_argument('--seconds', type=int, default=600, help='Length of the synthetic ECG')
+    args = parser.parse_args()
+
+    if args.input:
+        from .csv_reader import read_ekg_csv
+        signal, truth = read_ekg_csv(args.input, usecols='value')[1].astype(np.float64), None
+    else:
+        signal, truth = synthetic_ecg(args.seconds, args.fs)
+
+    for result in benchmark(signal, args.fs, truth=truth):
+        line = (f"chunk {result['chunk_size']:5d}: {result['seconds']:.2f}s ({result['realtime']:.0f}x realtime), "
+                f"latency mean {result['latency_mean']:.3f}s max {result['latency_max']:.3f}s, {result['beats']} beats")
+        if truth is not None:
+            line += f", sensitivity {result['sensitivity']:.3f} ppv {result['ppv']:.3f}"
+        print(line)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+import os
+import numpy as np
+import wfdb
+
+# WFDB format 16 stores this value for a missing sample
+WFDB_INVALID_16 = -32768
+
+
+class WFDBRecord:
+    """A WFDB record whose .hea is parsed once and whose format 16 .dat is memory-mapped.
+
+    Reading a channel or a time window returns a view into the map, so the cost is
+    O(window) instead of decoding the whole record like wfdb.rdsamp().
+    Records in other formats (or multi-segment records) fall back to windowed wfdb.rdsamp(),
+    or with a SignalCache are decoded once and memory-mapped from the cache.
+    """
+    def __init__(self, record_name, cache=None):
+        self.record_name = record_name
+        header = wfdb.rdheader(record_name)
+        self.fs = header.fs
+        self.n_sig = header.n_sig
+        self.sig_name = header.sig_name
+        self.units = header.units
+        self.num_samples = header.sig_len
+        self.gain = np.asarray(header.adc_gain if getattr(header, 'adc_gain', None) else [1.0] * self.n_sig, dtype=np.float64)
+        self.baseline = np.asarray(header.baseline if getattr(header, 'baseline', None) else [0] * self.n_sig, dtype=np.float64)
+        self.gain[self.gain == 0] = 200.0   # WFDB default when the header leaves the gain out
+        self.data = self._memmap(header)
+        self.signals = None
+        if self.data is None and cache is not None and not isinstance(header, wfdb.MultiRecord) and header.file_name:
+            source_files = [record_name + '.hea'] + sorted(set(os.path.join(os.path.dirname(record_name), file) for file in header.file_name))
+            self.signals = cache.get_or_load(source_files, 'wfdb_p_signal', lambda: {'p_signal': wfdb.rdsamp(record_name)[0]})['p_signal']
+            self.num_samples = self.signals.shape[0]
+
+    def _memmap(self, header):
+        """Map the .dat as a (samples, channels) int16 array, None if the layout is not plain format 16."""
+        if isinstance(header, wfdb.MultiRecord) or not header.file_name:
+            return None
+        if len(set(header.file_name)) != 1 or any(fmt != '16' for fmt in header.fmt):
+            return None
+        if any(spf not in (None, 1) for spf in header.samps_per_frame) or any(skew for skew in header.skew):
+            return None
+        byte_offset = header.byte_offset[0] or 0
+        dat_file = os.path.join(os.path.dirname(self.record_name), header.file_name[0])
+        frames = (os.path.getsize(dat_file) - byte_offset) // (2 * self.n_sig)
+        if self.num_samples is None or self.num_samples > frames:
+            self.num_samples = frames
+        if self.num_samples == 0:
+            return np.zeros((0, self.n_sig), dtype=np.int16)
+        return np.memmap(dat_file, dtype='<i2', mode='r', offset=byte_offset, shape=(self.num_samples, self.n_sig))
+
+    def digital(self, channel, sampfrom=0, sampto=None):
+        """Raw int16 samples of one channel, a zero-copy strided view when the record is mapped."""
+        sampto = self.num_samples if sampto is None else sampto
+        if self.data is not None:
+            return self.data[sampfrom:sampto, channel]
+        record = wfdb.rdrecord(self.record_name, sampfrom=sampfrom, sampto=sampto, channels=[channel], physical=False, return_res=16)
+        return record.d_signal[:, 0]
+
+    def physical(self, channel, sampfrom=0, sampto=None):
+        """Samples of one channel in physical units, same values as wfdb.rdsamp()."""
+        if self.signals is not None:
+            return np.array(self.signals[sampfrom:sampto, channel])
+        if self.data is None:
+            sampto = self.num_samples if sampto is None else sampto
+            signals, _ = wfdb.rdsamp(self.record_name, sampfrom=sampfrom, sampto=sampto, channels=[channel])
+            return signals[:, 0]
+        return to_physical(self.digital(channel, sampfrom, sampto), self.gain[channel], self.baseline[channel])
+
+
+def to_physical(digital, gain, baseline):
+    """(digital - baseline) / gain as float64, missing format 16 samples become NaN."""
+    signal = (np.asarray(digital, dtype=np.float64) - baseline) / gain
+    signal[np.asarray(digital) == WFDB_INVALID_16] = np.nan
+    return signal
+
+
+_records = {}
+def open_wfdb_record(record_name, cache=None):
+    """Cached WFDBRecord, the header is parsed again only when the .hea changes.
+    A SignalCache keeps decoded records that cannot be memory-mapped directly."""
+    header_file = record_name + '.hea'
+    key = (os.path.abspath(record_name), os.path.getmtime(header_file) if os.path.exists(header_file) else None,
+           cache.cache_dir if cache is not None else None)
+    if key not in _records:
+        _records[key] = WFDBRecord(record_name, cache)
+    return _records[key]
+
+
+def read_wfdb_window(record_name, channel_id=0, start_sec=0, end_sec=None):
+    """Read one channel between start_sec and end_sec of a WFDB record.
+    # Arguments
+        record_name: record name without extension
+        channel_id : channel to read
+        start_sec  : window start in seconds
+        end_sec    : window end in seconds, defaults to the end of the record
+    # Returns
+        digital, gain, baseline, fs: int16 samples (a view into the mapped .dat when possible)
+                                     and the values to_physical() needs
+    """
+    record = open_wfdb_record(record_name)
+    idx_start = max(int(start_sec * record.fs), 0)
+    idx_end = record.num_samples if end_sec is None else min(int(end_sec * record.fs), record.num_samples)
+    idx_end = max(idx_end, idx_start)
+    return record.digital(channel_id, idx_start, idx_end), record.gain[channel_id], record.baseline[channel_id], record.fs
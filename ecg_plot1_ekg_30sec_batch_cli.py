@@ -0,0 +1,169 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import os
+import sys
+import glob
+import time
+import logging
+import argparse
+import multiprocessing
+from ecg_plot1_ekg_30sec_cli import render_segment
+from ecg_plot1_ekg_30sec_cli_v3 import EKGProcessor, render_ekg_file
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+INPUT_EXTENSIONS = ('.csv', '.dat')
+MANIFEST_EXTENSIONS = ('.txt', '.list')
+
+def read_manifest(manifest_file):
+    """One input path per line, blank lines and '#' comments are skipped."""
+    base_dir = os.path.dirname(manifest_file)
+    inputs = []
+    with open(manifest_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                inputs.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+    return inputs
+
+def collect_inputs(sources):
+    """
+    Expand directories, glob patterns and manifest files into a list of EKG files.
+    """
+    inputs = []
+    for source in sources:
+        if os.path.isdir(source):
+            inputs.extend(sorted(os.path.join(source, file) for file in os.listdir(source) if file.endswith(INPUT_EXTENSIONS)))
+        elif source.endswith(MANIFEST_EXTENSIONS) and os.path.isfile(source):
+            inputs.extend(read_manifest(source))
+        elif glob.has_magic(source):
+            inputs.extend(sorted(file for file in glob.glob(source) if file.endswith(INPUT_EXTENSIONS)))
+        else:
+            inputs.append(source)
+    return inputs
+
+def output_location(name, start, end, output_dir=None):
+    """(output file name, path) of a strip: <name>_<start>_<end> in output_dir, or next to the input without one."""
+    directory = output_dir or os.path.dirname(name) or '.'
+    return f"{os.path.basename(name)}_{start}_{end}", os.path.join(directory, '')
+
+def file_tasks(inputs, channel=0, start=0, end=30, output_dir=None):
+    """One task per CSV/WFDB file, named the same way as ecg_plot1_ekg_30sec_cli_v3.py."""
+    tasks = []
+    for input_file in inputs:
+        output, path = output_location(input_file, start, end, output_dir)
+        tasks.append(('file', input_file, channel, start, end, output, path))
+    return tasks
+
+def segment_tasks(segment_list_file, channel=0, output_dir=None, chunk_size=30):
+    """One task per 30 second chunk of a step5 segment list (record,onset,offset per line)."""
+    tasks = []
+    with open(segment_list_file, 'r') as file:
+        for segment in file:
+            if not segment.strip():
+                continue
+            record_name, onset_str, offset_str = segment.strip().split(',')
+            onset, offset = int(onset_str), int(offset_str)
+            for start in range(onset, offset, chunk_size):
+                end = min(start + chunk_size, offset)
+                output, path = output_location(record_name, start, end, output_dir)
+                tasks.append(('segment', record_name, channel, start, end, output, path))
+    return tasks
+
+_processor = None
+_engine = 'template'
+
+def init_worker(fs=250, baseline=170, window_size=20, engine='template', cache_dir=None):
+    """Give this process its own Agg figure state and EKGProcessor, chart templates are cached per process."""
+    global _processor, _engine
+    matplotlib.use('Agg')
+    _processor = EKGProcessor(fs=fs, baseline=baseline, window_size=window_size, cache_dir=cache_dir)
+    _engine = engine
+
+def render_task(task):
+    """
+    Render one task and return (name, output, seconds, error); errors are reported, not raised.
+    """
+    kind, name, channel, start, end, output, path = task
+    t0 = time.perf_counter()
+    try:
+        if kind == 'segment':
+            output = render_segment(name, channel, start, end, output, path, engine=_engine)
+        else:
+            output = render_ekg_file(_processor, name, channel, start, end, output, path, engine=_engine)
+        error = None
+    except Exception as e:
+        error = str(e).strip()
+    return name, os.path.join(path, f"{output}.png") if output else None, time.perf_counter() - t0, error
+
+def render_batch(tasks, workers=1, chunksize=1, fs=250, baseline=170, window_size=20, engine='template', cache_dir=None):
+    """
+    Render all tasks, in this process when workers is 1, otherwise over a process pool.
+
+    Results come back in task order either way, so both paths write the same files.
+    """
+    if workers <= 1:
+        init_worker(fs, baseline, window_size, engine, cache_dir)
+        results = map(render_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(fs, baseline, window_size, engine, cache_dir))
+        results = pool.imap(render_task, tasks, chunksize=chunksize)
+
+    collected = []
+    try:
+        for name, output, elapsed, error in results:
+            if error is None:
+                logging.info(f"Rendered {name} -> {output} in {elapsed:.3f}s")
+            else:
+                logging.error(f"Error processing file '{name}' after {elapsed:.3f}s: {error}")
+            collected.append((name, output, elapsed, error))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return collected
+
+def main():
+    parser = argparse.ArgumentParser(description='Plot 30 second EKG strips for many files in one process.')
+    parser.add_argument('inputs', type=str, nargs='*', help='Input EKG files (WFDB .dat or CSV), directories, glob patterns or manifest files (.txt/.list)')
+    parser.add_argument('--segment_list', type=str, action='append', default=[], help='A step5 segment list (record,onset,offset per line) to plot in 30 second chunks, can be repeated')
+    parser.add_argument('--channel', type=int, default=0, help='The channel of the record to plot (for WFDB format)')
+    parser.add_argument('--start', type=int, default=0, help='The start time in seconds for the plot')
+    parser.add_argument('--end', type=int, default=30, help='The end time in seconds for the plot')
+    parser.add_argument('--output_dir', type=str, help='Directory for the plotted images, defaults to next to each input')
+    parser.add_argument('--fs', type=int, default=250, help='The sampling frequency of the EKG signal')
+    parser.add_argument('--baseline', type=int, default=170, help='The baseline value to add to the EKG signal (for CSV format)')
+    parser.add_argument('--window_size', type=int, default=20, help='The window size for moving average filtering')
+    parser.add_argument('--cache_dir', type=str, help='Directory to cache parsed recordings in, shared by the workers and reused on later runs')
+    parser.add_argument('--workers', type=int, default=1, help='Number of rendering processes, 0 means one per CPU core')
+    parser.add_argument('--engine', type=str, default='template', choices=['template', 'raster'], help="'template' reuses one matplotlib chart per geometry, 'raster' draws PNGs without matplotlib (no tick labels)")
+    parser.add_argument('--chunksize', type=int, default=4, help='Number of strips handed to a worker at a time')
+
+    args = parser.parse_args()
+
+    tasks = file_tasks(collect_inputs(args.inputs), args.channel, args.start, args.end, args.output_dir)
+    for segment_list_file in args.segment_list:
+        tasks.extend(segment_tasks(segment_list_file, args.channel, args.output_dir))
+    if not tasks:
+        logging.warning('No EKG files found.')
+        return 0
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    workers = args.workers or os.cpu_count()
+
+    t0 = time.perf_counter()
+    results = render_batch(tasks, min(workers, len(tasks)), args.chunksize, args.fs, args.baseline, args.window_size, args.engine, args.cache_dir)
+    total = time.perf_counter() - t0
+
+    failed = [name for name, _, _, error in results if error is not None]
+    logging.info(f"Rendered {len(results) - len(failed)}/{len(results)} strips with {workers} worker(s) in {total:.2f}s ({total / len(results):.3f}s per strip)")
+    for name in failed:
+        logging.warning(f"Failed: {name}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
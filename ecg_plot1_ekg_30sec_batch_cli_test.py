@@ -0,0 +1,36 @@
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+import wfdb
+from ecg_plot.streaming_qrs import synthetic_ecg
+
+# Absolute inputs without --output_dir: every strip is written next to its input, whatever the working directory
+repo_dir = os.path.dirname(os.path.abspath(__file__))
+data_dir = tempfile.mkdtemp()
+work_dir = tempfile.mkdtemp()
+
+ecg, _ = synthetic_ecg(60, 250)
+csv_file = os.path.join(data_dir, 's2.csv')
+with open(csv_file, 'w') as f:
+    f.writelines(f"{1000 + 4 * i},{value * 100:.3f}\n" for i, value in enumerate(ecg))
+
+record_name = os.path.join(data_dir, 'Case1')
+ecg, _ = synthetic_ecg(60, 240)
+wfdb.wrsamp('Case1', fs=240, units=['mV'], sig_name=['ECG'], p_signal=ecg[:, None], fmt=['16'], write_dir=data_dir)
+segment_list_file = os.path.join(data_dir, 'Case1.segment.list')
+with open(segment_list_file, 'w') as f:
+    f.write(f"{record_name},0,60\n")
+
+environment = dict(os.environ, PYTHONPATH=repo_dir)
+subprocess.run([sys.executable, os.path.join(repo_dir, 'ecg_plot1_ekg_30sec_batch_cli.py'), csv_file, data_dir,
+                '--segment_list', segment_list_file], cwd=work_dir, env=environment, check=True)
+
+for png in ('s2.csv_0_30.png', 'Case1.dat_0_30.png', 'Case1_0_30.png', 'Case1_30_60.png'):
+    assert os.path.isfile(os.path.join(data_dir, png)), png
+assert not os.listdir(work_dir)
+
+shutil.rmtree(data_dir)
+shutil.rmtree(work_dir)
@@ -1,19 +1,16 @@
 import ecg_plot
-import wfdb
+from ecg_plot.wfdb_reader import open_wfdb_record
 import numpy as np
 import matplotlib.pyplot as plt
 import argparse
 
 def plot_ekg(record_name, channel_id, start_sec, end_sec):
-    # Read the EKG data and header information
-    signals, fields = wfdb.rdsamp(record_name)
+    # Parse the header once and memory-map the EKG data
+    record = open_wfdb_record(record_name)
 
     # Extract the sampling frequency from the header information
-    fs = fields['fs']
-
-    # Calculate the timestamps for each sample
-    num_samples = signals.shape[0]
-    timestamps = np.arange(num_samples) / fs
+    fs = record.fs
+    num_samples = record.num_samples
 
     # Select the range to plot based on the start and end seconds provided
     idx_start = int(start_sec * fs)
@@ -25,10 +22,29 @@ def plot_ekg(record_name, channel_id, start_sec, end_sec):
 
     # Assuming the EKG signal is the first/2nd channel
     #ekg_signal = signals[idx_start:idx_end, 1]
-    ekg_signal = signals[idx_start:idx_end, channel_id]
-    plot_timestamps = timestamps[idx_start:idx_end]
+    ekg_signal = record.physical(channel_id, idx_start, idx_end)
+
+    # Calculate the timestamps for the selected samples only
+    plot_timestamps = np.arange(idx_start, idx_end) / fs
     return ekg_signal, plot_timestamps
 
+def render_segment(record_name, channel_id, start_sec, end_sec, output=None, path='./', engine=None):
+    ekg_signal, plot_timestamps = plot_ekg(record_name, channel_id, start_sec, end_sec)
+
+    # Save plotted pic as png
+    output_file = output or record_name+'_'+str(start_sec)+'_'+str(end_sec)
+    if engine == 'template':
+        template = ecg_plot.chart_template(sample_rate=240)
+        template.plot(ekg_signal)
+        template.save_as_png(output_file, path)
+    elif engine == 'raster':
+        image = ecg_plot.plot_single_channel_ekg_30sec_raster(ekg_signal, sample_rate=240, layout='tight')
+        ecg_plot.save_raster_as_png(image, output_file, path)
+    else:
+        ecg_plot.plot_single_channel_ekg_30sec(ekg_signal, sample_rate=240)
+        ecg_plot.save_as_png(output_file, path)
+    return output_file
+
 def main():
     # Set up the argument parser
     parser = argparse.ArgumentParser(description='Plot EKG signal for a given record and time range.')
@@ -40,12 +56,8 @@ def main():
     # Parse arguments
     args = parser.parse_args()
 
-    # Call the plot function with the provided arguments
-    ekg_signal, plot_timestamps = plot_ekg(args.record_name, args.channel_id, args.start_sec, args.end_sec)
-
-    # Save plotted pic as jpg
-    ecg_plot.plot_single_channel_ekg_30sec(ekg_signal, sample_rate=240)
-    ecg_plot.save_as_png(args.record_name+'_'+str(args.start_sec)+'_'+str(args.end_sec))
+    # Plot and save the selected range as png
+    render_segment(args.record_name, args.channel_id, args.start_sec, args.end_sec)
 
 if __name__ == '__main__':
     main()
@@ -1,20 +1,20 @@
 import ecg_plot
-import wfdb
+from ecg_plot.wfdb_reader import open_wfdb_record
+from ecg_plot.csv_reader import read_ekg_csv
+from ecg_plot.signal_cache import SignalCache
+from ecg_plot.filters import FilterBank
 import numpy as np
 import argparse
-import pandas as pd
-from scipy.signal import butter, filtfilt, find_peaks
+from scipy.signal import find_peaks
 
 class SignalProcessing:
     def __init__(self, fs=250):
         self.fs = fs
+        self.filter_bank = FilterBank(fs)
 
-    def bandpass_filter(self, signal, lowcut, highcut, order=5):
-        nyquist = 0.5 * self.fs
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        b, a = butter(order, [low, high], btype='band')
-        return filtfilt(b, a, signal)
+    def bandpass_filter(self, signal, lowcut, highcut, order=5, axis=-1):
+        # Cached second-order-sections design, signal can be a 2-D batch with time along axis
+        return self.filter_bank.bandpass(signal, lowcut, highcut, order, axis=axis)
 
     def pan_tompkins_qrs_detect(self, signal):
         filtered_signal = self.bandpass_filter(signal, 5, 15)
@@ -33,6 +33,108 @@ class SignalProcessing:
     def combine_ekg(self, bandpass_filtered_ekg, moving_averaged_ekg, qrs_peaks, window_before=0.1, window_after=0.1,
                     window_before_ex=0.025, window_after_ex=0.025, bpfilt_qrs_weight=0.99, mafilt_pt_weight=0.8,
                     max_gap_window=20, min_peak_distance=0.01, peak_threshold=0.2, smoothing_window=5):
+        """
+        Blend the bandpass filtered signal into the moving average around every QRS complex.
+
+        Same result as combine_ekg_loop() (up to float summation order in the gap smoothing),
+        but all QRS boundaries come from one find_peaks() over the whole signal and the blend
+        is written through index arrays, so the cost does not grow with Python calls per beat.
+        """
+        qrs_peaks = np.asarray(qrs_peaks, dtype=np.int64)
+        min_peak_distance_samples = int(min_peak_distance * self.fs)
+        # The loop finds minima per window, which equals a global search only when the distance
+        # rule cannot drop a minimum (neighbouring local minima are always >= 2 samples apart)
+        # and when later peaks never come before earlier ones.
+        if not 1 <= min_peak_distance_samples <= 2 or np.any(np.diff(qrs_peaks) < 0):
+            return self.combine_ekg_loop(bandpass_filtered_ekg, moving_averaged_ekg, qrs_peaks, window_before, window_after,
+                                         window_before_ex, window_after_ex, bpfilt_qrs_weight, mafilt_pt_weight,
+                                         max_gap_window, min_peak_distance, peak_threshold, smoothing_window)
+
+        n = len(bandpass_filtered_ekg)
+        combined_ekg = moving_averaged_ekg.copy()
+        peak_threshold = np.mean(bandpass_filtered_ekg) * peak_threshold
+
+        # Windows around every QRS complex, int() truncation as in the loop
+        orig_start = np.maximum(0, (qrs_peaks - window_before * self.fs).astype(np.int64))
+        orig_end = np.minimum(n, (qrs_peaks + window_after * self.fs).astype(np.int64))
+
+        # All local minima below the threshold; a minimum is found inside a window when its
+        # whole plateau and both neighbours lie in the window
+        minima, properties = find_peaks(-bandpass_filtered_ekg, height=-peak_threshold, plateau_size=1)
+        left_edges, right_edges = properties['left_edges'], properties['right_edges']
+
+        # First minimum after each peak ends the QRS complex
+        updated_end = orig_end.copy()
+        if len(minima):
+            after = np.searchsorted(left_edges, qrs_peaks, side='right')
+            found = after < len(minima)
+            after = np.minimum(after, len(minima) - 1)
+            found &= right_edges[after] < orig_end - 1
+            updated_end[found] = np.minimum((minima[after[found]] + window_after_ex * self.fs).astype(np.int64), orig_end[found])
+
+            # Last minimum before each peak starts it
+            before = np.searchsorted(right_edges, qrs_peaks - 1, side='left') - 1
+            found = before >= 0
+            before = np.maximum(before, 0)
+            found &= left_edges[before] > orig_start
+            updated_start = orig_start.copy()
+            updated_start[found] = np.maximum((minima[before[found]] - window_before_ex * self.fs).astype(np.int64), orig_start[found])
+        else:
+            updated_start = orig_start.copy()
+
+        # Later peaks overwrite earlier ones, so every sample belongs to the last window starting at or before it
+        owned_end = np.minimum(orig_end, np.append(orig_start[1:], n))
+
+        def ranges(starts, ends):
+            starts, ends = starts[ends > starts], ends[ends > starts]
+            counts = ends - starts
+            return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        # QRS complexes
+        qrs = ranges(updated_start, np.minimum(updated_end, owned_end))
+        combined_ekg[qrs] = (
+            bandpass_filtered_ekg[qrs] * bpfilt_qrs_weight +
+            moving_averaged_ekg[qrs] * (1 - bpfilt_qrs_weight)
+        )
+
+        # Gaps before and after the QRS complexes, smoothed over the whole gap, written where owned
+        gap_start = np.concatenate([orig_start, updated_end])
+        gap_end = np.concatenate([updated_start, orig_end])
+        gap_owned = np.concatenate([np.minimum(updated_start, owned_end), np.minimum(orig_end, owned_end)])
+        keep = (gap_start < gap_end) & (gap_start < gap_owned)
+        gap_start, gap_end, gap_owned = gap_start[keep], gap_end[keep], gap_owned[keep]
+        gap_window = np.minimum(gap_end - gap_start, max_gap_window)
+        for window_size in np.unique(gap_window):
+            group = gap_window == window_size
+            starts, ends, owned = gap_start[group], gap_end[group], gap_owned[group]
+            # Gaps laid end to end with window_size zeros in between convolve like separate 'same' convolutions
+            sizes = ends - starts
+            offsets = np.cumsum(sizes + window_size) - sizes
+            samples = ranges(starts, ends)
+            positions = ranges(offsets, offsets + sizes)
+            bandpass_gaps = np.zeros(offsets[-1] + sizes[-1] + window_size)
+            averaged_gaps = np.zeros_like(bandpass_gaps)
+            bandpass_gaps[positions] = bandpass_filtered_ekg[samples]
+            averaged_gaps[positions] = moving_averaged_ekg[samples]
+            weights = np.ones(window_size) / window_size
+            shift = (window_size - 1) // 2
+            filtered_gap = np.convolve(bandpass_gaps, weights, mode='full')[positions + shift]
+            smoothed_gap = np.convolve(averaged_gaps, weights, mode='full')[positions + shift]
+
+            write = samples < np.repeat(owned, sizes)
+            combined_ekg[samples[write]] = (
+                smoothed_gap[write] * mafilt_pt_weight +
+                filtered_gap[write] * (1 - mafilt_pt_weight)
+            )
+
+        # Apply final smoothing to the combined signal
+        combined_ekg = np.convolve(combined_ekg, np.ones(smoothing_window) / smoothing_window, mode='same')
+        return combined_ekg
+
+    def combine_ekg_loop(self, bandpass_filtered_ekg, moving_averaged_ekg, qrs_peaks, window_before=0.1, window_after=0.1,
+                         window_before_ex=0.025, window_after_ex=0.025, bpfilt_qrs_weight=0.99, mafilt_pt_weight=0.8,
+                         max_gap_window=20, min_peak_distance=0.01, peak_threshold=0.2, smoothing_window=5):
+        """Reference implementation of combine_ekg(), one find_peaks() and np.convolve() per beat."""
         combined_ekg = moving_averaged_ekg.copy()
         min_peak_distance = int(min_peak_distance * self.fs)
         peak_threshold = np.mean(bandpass_filtered_ekg) * peak_threshold
@@ -78,16 +180,17 @@ class SignalProcessing:
         return combined_ekg
 
 class EKGProcessor:
-    def __init__(self, fs=250, baseline=170, window_size=20):
+    def __init__(self, fs=250, baseline=170, window_size=20, cache_dir=None):
         self.fs = fs
         self.baseline = baseline
         self.window_size = window_size
         self.signal_processing = SignalProcessing(fs)
+        # Parsed recordings are kept as .npy under cache_dir and reused while the source is unchanged
+        self.cache = SignalCache(cache_dir) if cache_dir else None
 
     def process_csv_ekg(self, input_file):
-        ekg_data = pd.read_csv(input_file, header=None)
-        ekg_values = ekg_data.values[:, 1] - np.mean(ekg_data.values[:, 1]) # + self.baseline
-        timestamps = ekg_data.values[:, 0]
+        timestamps, values = read_ekg_csv(input_file, cache=self.cache)
+        ekg_values = np.subtract(values, np.mean(values, dtype=np.float64), dtype=np.float64) # + self.baseline
 
         bandpass_filtered_ekg = self.signal_processing.bandpass_filter(ekg_values, 0.5, 50, order=4)
         moving_averaged_ekg = self.signal_processing.moving_average(bandpass_filtered_ekg, window_size=self.window_size)
@@ -98,10 +201,10 @@ class EKGProcessor:
         return combined_ekg, timestamps
 
     def process_wfdb_ekg(self, record_name, channel_id, start_sec, end_sec):
-        signals, fields = wfdb.rdsamp(record_name)
-        fs = fields['fs']
-        num_samples = signals.shape[0]
-        timestamps = np.arange(num_samples) / fs
+        # Header is parsed once per record, only the window of one channel is read from the .dat
+        record = open_wfdb_record(record_name, cache=self.cache)
+        fs = record.fs
+        num_samples = record.num_samples
 
         idx_start = int(start_sec * fs)
         idx_end = int(end_sec * fs)
@@ -109,8 +212,8 @@ class EKGProcessor:
         idx_start = max(idx_start, 0)
         idx_end = min(idx_end, num_samples - 1)
 
-        ekg_signal = signals[idx_start:idx_end, channel_id]
-        plot_timestamps = timestamps[idx_start:idx_end]
+        ekg_signal = record.physical(channel_id, idx_start, idx_end)
+        plot_timestamps = np.arange(idx_start, idx_end) / fs
 
         return ekg_signal, plot_timestamps, fs
 
@@ -124,10 +227,11 @@ def main():
     parser.add_argument('--fs', type=int, default=250, help='The sampling frequency of the EKG signal')
     parser.add_argument('--baseline', type=int, default=170, help='The baseline value to add to the EKG signal (for CSV format)')
     parser.add_argument('--window_size', type=int, default=20, help='The window size for moving average filtering')
+    parser.add_argument('--cache_dir', type=str, help='Directory to cache parsed recordings in, reused on later runs')
 
     args = parser.parse_args()
 
-    processor = EKGProcessor(fs=args.fs, baseline=args.baseline, window_size=args.window_size)
+    processor = EKGProcessor(fs=args.fs, baseline=args.baseline, window_size=args.window_size, cache_dir=args.cache_dir)
 
     if args.input.endswith('.dat'):
         ekg_signal, plot_timestamps, fs = processor.process_wfdb_ekg(args.input, args.channel, args.start, args.end)
@@ -1,42 +1,44 @@
+import os
 import ecg_plot
-import wfdb
+from ecg_plot.wfdb_reader import open_wfdb_record
+from ecg_plot.csv_reader import read_ekg_csv
+from ecg_plot.signal_cache import SignalCache
+from ecg_plot.filters import FilterBank
 import numpy as np
 import argparse
-import pandas as pd
-from scipy.signal import butter, filtfilt, find_peaks
+from scipy.signal import find_peaks
 
 class SignalProcessing:
     def __init__(self, fs=250):
         self.fs = fs
+        self.filter_bank = FilterBank(fs)
 
-    def bandpass_filter(self, signal, lowcut, highcut, order=5):
-        nyquist = 0.5 * self.fs
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        b, a = butter(order, [low, high], btype='band')
-        return filtfilt(b, a, signal)
+    def bandpass_filter(self, signal, lowcut, highcut, order=5, axis=-1):
+        # Cached second-order-sections design, signal can be a 2-D batch with time along axis
+        return self.filter_bank.bandpass(signal, lowcut, highcut, order, axis=axis)
 
 class EKGProcessor:
-    def __init__(self, fs=250, baseline=170, window_size=20):
+    def __init__(self, fs=250, baseline=170, window_size=20, cache_dir=None):
         self.fs = fs
         self.baseline = baseline
         self.window_size = window_size
         self.signal_processing = SignalProcessing(fs)
+        # Parsed recordings are kept as .npy under cache_dir and reused while the source is unchanged
+        self.cache = SignalCache(cache_dir) if cache_dir else None
 
     def process_csv_ekg(self, input_file):
-        ekg_data = pd.read_csv(input_file, header=None)
-        ekg_values = ekg_data.values[:, 1] - np.mean(ekg_data.values[:, 1]) # + self.baseline
-        timestamps = ekg_data.values[:, 0]
+        timestamps, values = read_ekg_csv(input_file, cache=self.cache)
+        ekg_values = np.subtract(values, np.mean(values, dtype=np.float64), dtype=np.float64) # + self.baseline
 
         bandpass_filtered_ekg = self.signal_processing.bandpass_filter(ekg_values, 0.5, 50, order=4)
 
         return bandpass_filtered_ekg, timestamps
 
     def process_wfdb_ekg(self, record_name, channel_id, start_sec, end_sec):
-        signals, fields = wfdb.rdsamp(record_name)
-        fs = fields['fs']
-        num_samples = signals.shape[0]
-        timestamps = np.arange(num_samples) / fs
+        # Header is parsed once per record, only the window of one channel is read from the .dat
+        record = open_wfdb_record(record_name, cache=self.cache)
+        fs = record.fs
+        num_samples = record.num_samples
 
         idx_start = int(start_sec * fs)
         idx_end = int(end_sec * fs)
@@ -44,11 +46,34 @@ class EKGProcessor:
         idx_start = max(idx_start, 0)
         idx_end = min(idx_end, num_samples - 1)
 
-        ekg_signal = signals[idx_start:idx_end, channel_id]
-        plot_timestamps = timestamps[idx_start:idx_end]
+        ekg_signal = record.physical(channel_id, idx_start, idx_end)
+        plot_timestamps = np.arange(idx_start, idx_end) / fs
 
         return ekg_signal, plot_timestamps, fs
 
+def render_ekg_file(processor, input_file, channel=0, start=0, end=30, output=None, path='./', engine=None):
+    if input_file.endswith('.dat'):
+        record_name = os.path.splitext(input_file)[0]
+        ekg_signal, plot_timestamps, fs = processor.process_wfdb_ekg(record_name, channel, start, end)
+    elif input_file.endswith('.csv'):
+        ekg_signal, plot_timestamps = processor.process_csv_ekg(input_file)
+        fs = processor.fs
+    else:
+        raise ValueError('Unsupported input file format. Please provide a WFDB (.dat) or CSV file.')
+
+    output_file = output or f"{input_file}_{start}_{end}"
+    if engine == 'template':
+        template = ecg_plot.chart_template(sample_rate=fs)
+        template.plot(ekg_signal)
+        template.save_as_png(output_file, path)
+    elif engine == 'raster':
+        image = ecg_plot.plot_single_channel_ekg_30sec_raster(ekg_signal, sample_rate=fs, layout='tight')
+        ecg_plot.save_raster_as_png(image, output_file, path)
+    else:
+        ecg_plot.plot_single_channel_ekg_30sec(ekg_signal, sample_rate=fs)
+        ecg_plot.save_as_png(output_file, path)
+    return output_file
+
 def main():
     parser = argparse.ArgumentParser(description='Plot EKG signal for a given record and time range.')
     parser.add_argument('--input', type=str, required=True, help='The input EKG data file (WFDB or CSV format)')
@@ -59,22 +84,13 @@ def main():
     parser.add_argument('--fs', type=int, default=250, help='The sampling frequency of the EKG signal')
     parser.add_argument('--baseline', type=int, default=170, help='The baseline value to add to the EKG signal (for CSV format)')
     parser.add_argument('--window_size', type=int, default=20, help='The window size for moving average filtering')
+    parser.add_argument('--cache_dir', type=str, help='Directory to cache parsed recordings in, reused on later runs')
 
     args = parser.parse_args()
 
-    processor = EKGProcessor(fs=args.fs, baseline=args.baseline, window_size=args.window_size)
-
-    if args.input.endswith('.dat'):
-        ekg_signal, plot_timestamps, fs = processor.process_wfdb_ekg(args.input, args.channel, args.start, args.end)
-    elif args.input.endswith('.csv'):
-        ekg_signal, plot_timestamps = processor.process_csv_ekg(args.input)
-        fs = args.fs
-    else:
-        raise ValueError('Unsupported input file format. Please provide a WFDB (.dat) or CSV file.')
+    processor = EKGProcessor(fs=args.fs, baseline=args.baseline, window_size=args.window_size, cache_dir=args.cache_dir)
 
-    ecg_plot.plot_single_channel_ekg_30sec(ekg_signal, sample_rate=fs)
-    output_file = args.output or f"{args.input}_{args.start}_{args.end}"
-    ecg_plot.save_as_png(output_file)
+    render_ekg_file(processor, args.input, args.channel, args.start, args.end, args.output)
 
 if __name__ == '__main__':
     main()
@@ -14,3 +14,73 @@ ecg_plot.save_as_png('example_ecg_12_lead')
 
 ecg_plot.plot_1(ecg[1], sample_rate=500, title = 'lead-II EKG')
 ecg_plot.save_as_png('example_ecg_lead_ii')
+
+# Direct raster engine, checked against the matplotlib strip with the same layout
+import numpy as np
+strip = np.tile(ecg[1], 3)
+template = ecg_plot.chart_template(sample_rate=500)
+template.plot(strip)
+reference = template.render(layout=None)[..., :3].astype(float)
+raster = ecg_plot.plot_single_channel_ekg_30sec_raster(strip, sample_rate=500)
+assert raster.shape == reference.shape
+assert np.abs(raster - reference).mean() / 255 < 0.01
+ecg_plot.save_raster_as_png(raster, 'example_ecg_lead_ii_raster')
+
+# Short strips are zero-padded to 30 s like the matplotlib chart pads them, the flat line is drawn to the end
+short = strip[:5 * 500 + 123]
+template.plot(short)
+reference = template.render(layout=None)[..., :3].astype(float)
+raster = ecg_plot.plot_single_channel_ekg_30sec_raster(short, sample_rate=500)
+padded = np.concatenate([short, np.zeros(30 * 500 - len(short))])
+assert np.array_equal(raster, ecg_plot.plot_single_channel_ekg_30sec_raster(padded, sample_rate=500))
+assert np.abs(raster - reference).mean() / 255 < 0.01
+flat = ecg_plot.plot_single_channel_ekg_30sec_raster(np.zeros(30 * 500), sample_rate=500)
+tail_columns = slice(int(raster.shape[1] * 0.6), int(raster.shape[1] * 0.85))
+assert np.array_equal(raster[:, tail_columns], flat[:, tail_columns])
+
+# decimate=False draws every sample, for multi lead input as well
+import matplotlib.pyplot as plt
+for plot_function in (ecg_plot.plot, ecg_plot.plot_12):
+    plot_function(ecg, sample_rate=500, decimate=False)
+    plt.close('all')
+ecg_plot.plot_1(ecg[1], sample_rate=500, decimate=False)
+plt.close('all')
+
+# Leads of different lengths are drawn one by one
+ragged = [lead[:len(lead) - 100 * i] for i, lead in enumerate(ecg)]
+for decimate in (True, False):
+    ecg_plot.plot(ragged, sample_rate=500, decimate=decimate)
+    ecg_plot.plot_12(ragged, sample_rate=500, decimate=decimate)
+    plt.close('all')
+
+# CSV exports: the fast path, and the pandas fallback for a header row, float timestamps and missing values
+import os
+import tempfile
+from ecg_plot.csv_reader import read_ekg_csv
+csv_dir = tempfile.mkdtemp()
+plain_csv, headered_csv, float_csv = (os.path.join(csv_dir, name) for name in ('plain.csv', 'headered.csv', 'float.csv'))
+with open(plain_csv, 'w') as f:
+    f.write('1000,0.5\n1004,0.25\n1008,-0.125\n')
+with open(headered_csv, 'w') as f:
+    f.write('timestamp,value\n1000,0.5\n1004,\n1008,-0.125\n')
+with open(float_csv, 'w') as f:
+    f.write('1000.5,0.5\n1004.5,0.25\n')
+timestamps, values = read_ekg_csv(plain_csv)
+assert timestamps.tolist() == [1000, 1004, 1008] and values.tolist() == [0.5, 0.25, -0.125]
+timestamps, values = read_ekg_csv(headered_csv)
+assert timestamps.tolist() == [1000, 1004, 1008] and values[0] == 0.5 and np.isnan(values[1]) and values[2] == -0.125
+assert read_ekg_csv(headered_csv, usecols='value')[0] is None
+timestamps, values = read_ekg_csv(float_csv)
+assert timestamps.tolist() == [1000.5, 1004.5] and values.tolist() == [0.5, 0.25]
+
+# Streaming QRS detection resumes after missing samples, a NaN must not stay in the filter states
+from ecg_plot.streaming_qrs import detect_rpeaks_streaming, synthetic_ecg
+from ecg_plot.rpeaks import compare_rpeaks
+signal, truth = synthetic_ecg(60, 250)
+signal[1000] = np.nan                 # single dropout at 4 s
+signal[5000:5250] = np.nan            # one second gap at 20 s
+signal[:3] = np.nan                   # stream starting with missing samples
+rpeaks = detect_rpeaks_streaming(signal, 250, chunk_size=25)
+after_gap = truth[truth > 22 * 250]
+assert compare_rpeaks(after_gap, rpeaks[rpeaks > 22 * 250], 250)['sensitivity'] > 0.95
+assert compare_rpeaks(truth, rpeaks, 250)['sensitivity'] > 0.9
@@ -1,18 +1,31 @@
-import wfdb
+from ecg_plot.wfdb_reader import open_wfdb_record
+from ecg_plot.pyramid import open_pyramid
 import numpy as np
 import matplotlib.pyplot as plt
 import argparse
 
+def plot_ekg_pyramid(record_name, start_sec, end_sec, width=1000):
+    # Min/max envelope from the record's zoom pyramid (built on first use), at most a few points per pixel
+    pyramid = open_pyramid(record_name)
+    ekg_signal, sample_rate, signal_start = pyramid.window(start_sec, end_sec, width)
+    plot_timestamps = signal_start + np.arange(len(ekg_signal)) / sample_rate
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(plot_timestamps, ekg_signal)
+    plt.xlim(start_sec, end_sec)
+    plt.xlabel('Time (seconds)')
+    plt.ylabel('EKG Signal')
+    plt.title(f'EKG Signal from {record_name} between {start_sec} and {end_sec} seconds')
+    plt.grid(True)
+    plt.show()
+
 def plot_ekg(record_name, start_sec, end_sec):
-    # Read the EKG data and header information
-    signals, fields = wfdb.rdsamp(record_name)
+    # Parse the header once and memory-map the EKG data
+    record = open_wfdb_record(record_name)
 
     # Extract the sampling frequency from the header information
-    fs = fields['fs']
-
-    # Calculate the timestamps for each sample
-    num_samples = signals.shape[0]
-    timestamps = np.arange(num_samples) / fs
+    fs = record.fs
+    num_samples = record.num_samples
 
     # Select the range to plot based on the start and end seconds provided
     idx_start = int(start_sec * fs)
@@ -23,8 +36,10 @@ def plot_ekg(record_name, start_sec, end_sec):
     idx_end = min(idx_end, num_samples - 1)
 
     # Assuming the EKG signal is the first channel
-    ekg_signal = signals[idx_start:idx_end, 0]
-    plot_timestamps = timestamps[idx_start:idx_end]
+    ekg_signal = record.physical(0, idx_start, idx_end)
+
+    # Calculate the timestamps for the selected samples only
+    plot_timestamps = np.arange(idx_start, idx_end) / fs
 
     # Plotting the EKG signal within the specified time range
     plt.figure(figsize=(10, 6))
@@ -41,12 +56,16 @@ def main():
     parser.add_argument('record_name', type=str, help='The name of the record to plot')
     parser.add_argument('start_sec', type=float, help='The start time in seconds for the plot')
     parser.add_argument('end_sec', type=float, help='The end time in seconds for the plot')
+    parser.add_argument('--pyramid', action='store_true', help='Plot from the min/max zoom pyramid of the record (see ecg_pyramid_cli.py), for windows of hours or days')
 
     # Parse arguments
     args = parser.parse_args()
 
     # Call the plot function with the provided arguments
-    plot_ekg(args.record_name, args.start_sec, args.end_sec)
+    if args.pyramid:
+        plot_ekg_pyramid(args.record_name, args.start_sec, args.end_sec)
+    else:
+        plot_ekg(args.record_name, args.start_sec, args.end_sec)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,79 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import os
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
+from ecg_plot.pyramid import build_pyramid, open_pyramid, pyramid_dir
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def build_pyramids(records, channel=0, directory=None, force=False):
+    """Build the pyramid of every record that has none or whose record changed, returns the failed records."""
+    failed = []
+    for record_name in records:
+        t0 = time.perf_counter()
+        try:
+            if force:
+                build_pyramid(record_name, channel, directory)
+            pyramid = open_pyramid(record_name, channel, directory)
+        except Exception as e:
+            logging.error(f"Error building the pyramid of '{record_name}': {str(e).strip()}")
+            failed.append(record_name)
+            continue
+        path = pyramid_dir(record_name, channel, directory)
+        size = sum(os.path.getsize(os.path.join(path, file)) for file in os.listdir(path))
+        logging.info(f"{record_name}: {pyramid.num_samples} samples, levels {pyramid.base_level}-{pyramid.top_level}, "
+                     f"{size / 2 ** 20:.1f} MiB in {path} ({time.perf_counter() - t0:.2f}s)")
+    return failed
+
+def plot_window(record_name, start_sec, end_sec, output_file, channel=0, directory=None, width=2000, height=400, dpi=100):
+    """Plot [start_sec, end_sec) of a record from its pyramid into a width x height pixel PNG."""
+    pyramid = open_pyramid(record_name, channel, directory)
+    t0 = time.perf_counter()
+    signal, sample_rate, signal_start = pyramid.window(start_sec, end_sec, width)
+    elapsed = time.perf_counter() - t0
+
+    plt.figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    plt.plot(signal_start + np.arange(len(signal)) / sample_rate, signal, linewidth=0.5)
+    plt.xlim(start_sec, end_sec)
+    plt.xlabel('Time (seconds)')
+    plt.ylabel('EKG Signal')
+    plt.title(f'EKG Signal from {record_name} between {start_sec} and {end_sec} seconds')
+    plt.grid(True)
+    plt.savefig(output_file, dpi=dpi)
+    plt.close()
+    logging.info(f"{record_name} {start_sec}-{end_sec}s: {len(signal)} points at {sample_rate:g} Hz read in {elapsed * 1000:.2f}ms -> {output_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute min/max zoom pyramids of WFDB records, and plot any window of a record from them.')
+    parser.add_argument('records', type=str, nargs='+', help='Record names without extension')
+    parser.add_argument('--channel', type=int, default=0, help='The channel of the records')
+    parser.add_argument('--pyramid_dir', type=str, help='Directory for the pyramids, defaults to next to each record')
+    parser.add_argument('--force', action='store_true', help='Rebuild pyramids that are up to date')
+    parser.add_argument('--window', type=float, nargs=2, metavar=('START_SEC', 'END_SEC'), help='Also plot this window of every record')
+    parser.add_argument('--width', type=int, default=2000, help='Width of the window plot in pixels')
+    parser.add_argument('--output_dir', type=str, default='./', help='Directory for the window plots')
+    args = parser.parse_args()
+
+    if args.pyramid_dir:
+        os.makedirs(args.pyramid_dir, exist_ok=True)
+    failed = build_pyramids(args.records, args.channel, args.pyramid_dir, args.force)
+
+    if args.window:
+        start_sec, end_sec = args.window
+        os.makedirs(args.output_dir, exist_ok=True)
+        for record_name in args.records:
+            if record_name in failed:
+                continue
+            output_file = os.path.join(args.output_dir, f"{os.path.basename(record_name)}_{start_sec:g}_{end_sec:g}.png")
+            plot_window(record_name, start_sec, end_sec, output_file, args.channel, args.pyramid_dir, args.width)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
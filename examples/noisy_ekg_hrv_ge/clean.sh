@@ -1,2 +1,3 @@
 rm *.txt
 rm *.part*.dat
+rm *.nn.npz
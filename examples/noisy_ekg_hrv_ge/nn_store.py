@@ -0,0 +1,87 @@
+import os
+import numpy as np
+
+STORE_EXTENSION = '.nn.npz'
+
+def store_path(record_name, directory='./'):
+    """Path of the NN store of a record."""
+    return os.path.join(directory, f"{record_name}{STORE_EXTENSION}")
+
+def list_stores(directory='./'):
+    """NN store files of a directory, sorted."""
+    return sorted(os.path.join(directory, file) for file in os.listdir(directory) if file.endswith(STORE_EXTENSION))
+
+def _ragged(arrays, dtype):
+    """Concatenation of arrays and the offsets of each one in it, offsets[i]:offsets[i + 1] is arrays[i]."""
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(array) for array in arrays])
+    values = np.concatenate([np.asarray(array, dtype=dtype) for array in arrays]) if arrays else np.zeros(0, dtype=dtype)
+    return values, offsets
+
+class NNStore:
+    """
+    R-peaks, NN intervals and GMM analyses of all non-noisy segments of one record, in one .npz file.
+
+    Per-segment arrays are stored concatenated with an offsets index, the analyses as columns
+    (-1 where a segment had too few samples) plus one row per valid distribution.
+    """
+    def __init__(self, record, fs, segments, rpeaks, alerts=None, analyses=None):
+        self.record = record
+        self.fs = fs
+        self.segments = np.asarray(segments, dtype=np.int64).reshape(-1, 2)
+        self.rpeak_values, self.rpeak_offsets = _ragged(rpeaks, np.int64)
+        self.alerts = np.zeros((0, 2)) if alerts is None else np.asarray(alerts, dtype=np.float64).reshape(-1, 2)
+        self.analyses = analyses
+
+    def __len__(self):
+        return len(self.segments)
+
+    def rpeaks(self, i):
+        """R-peak sample indices of segment i, relative to the segment start."""
+        return self.rpeak_values[self.rpeak_offsets[i]:self.rpeak_offsets[i + 1]]
+
+    def nn_intervals(self, i):
+        """NN intervals of segment i in seconds, as step2 writes them to .nni.txt."""
+        return np.diff(self.rpeaks(i)) / self.fs
+
+    def all_nn_intervals(self):
+        return [self.nn_intervals(i) for i in range(len(self))]
+
+    def segment_name(self, i):
+        """<record>.<start>-<end> as in the .nni.txt / .nna.txt file names."""
+        start, end = self.segments[i] / self.fs
+        return f"{self.record}.{start:.2f}-{end:.2f}"
+
+    def save(self, path):
+        """Write the store, through a temporary file so readers never see a partial one."""
+        arrays = {'record': np.array(self.record), 'fs': np.array(self.fs), 'segments': self.segments,
+                  'rpeak_values': self.rpeak_values, 'rpeak_offsets': self.rpeak_offsets, 'alerts': self.alerts}
+        if self.analyses is not None:
+            arrays['samples'] = np.array([analysis['samples'] for analysis in self.analyses], dtype=np.int64)
+            arrays['best_n_components'] = np.array([analysis.get('best_n_components', -1) for analysis in self.analyses], dtype=np.int64)
+            arrays['num_valid_distributions'] = np.array([analysis.get('num_valid_distributions', -1) for analysis in self.analyses], dtype=np.int64)
+            # segment, index, kurtosis, mean, std per valid distribution
+            rows = [(i,) + tuple(distribution) for i, analysis in enumerate(self.analyses) for distribution in analysis.get('distributions', [])]
+            arrays['distributions'] = np.array(rows, dtype=np.float64).reshape(-1, 5)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            store = cls(str(data['record']), data['fs'].item(), data['segments'], [], data['alerts'])
+            store.rpeak_values, store.rpeak_offsets = data['rpeak_values'], data['rpeak_offsets']
+            if 'samples' in data:
+                store.analyses = []
+                for i, samples in enumerate(data['samples']):
+                    analysis = {'samples': int(samples)}
+                    if data['best_n_components'][i] >= 0:
+                        analysis['best_n_components'] = int(data['best_n_components'][i])
+                        analysis['num_valid_distributions'] = int(data['num_valid_distributions'][i])
+                        analysis['distributions'] = []
+                    store.analyses.append(analysis)
+                for segment, index, distribution_kurtosis, mean, std in data['distributions']:
+                    store.analyses[int(segment)]['distributions'].append((int(index), distribution_kurtosis, mean, std))
+        return store
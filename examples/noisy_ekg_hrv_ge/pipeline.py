@@ -0,0 +1,143 @@
+import os
+import time
+import argparse
+import logging
+import numpy as np
+from ecg_plot.wfdb_reader import open_wfdb_record
+from ecg_plot.rpeaks import detect_segment_rpeaks, biosppy_rpeaks
+from step1_noise_spike_detect import detect_ekg_spikes, generate_spike_alerts
+from step2_nn_intervals_gen import create_noise_mask, extract_non_noisy_segments
+from step3_nn_hist_analysis import analyse_nni_batch, format_analysis
+from step4_potential_arrhy import is_abnormal_analysis
+from nn_store import NNStore, store_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class NoisyEKGPipeline:
+    """
+    Steps 1-4 of the example on one record at a time, with arrays passed in memory.
+
+    The record is read once, spike alerts, the noise mask, the non-noisy segments, their NN
+    intervals and GMM analyses are kept as arrays and dicts, and files are written only by
+    write() at the end. The defaults are those of the step scripts, so the segment list matches
+    what step1 ... step4 produce for the same record.
+    """
+    def __init__(self, spike_fs=240, median_signal=5, spike_threshold=50, spike_window=60, alert_window=5*60,
+                 segment_length=5*60*250, rpeak_engine='biosppy'):
+        self.spike_fs = spike_fs
+        self.median_signal = median_signal
+        self.spike_threshold = spike_threshold
+        self.spike_window = spike_window
+        self.alert_window = alert_window
+        self.segment_length = segment_length
+        self.rpeak_engine = rpeak_engine
+
+    def detect_noise(self, signal):
+        """Step 1: (n, 2) array of the (start, end) seconds of every alert window containing spike noise."""
+        spike_mask = detect_ekg_spikes(signal=signal, fs=self.spike_fs, median_signal=self.median_signal, threshold=self.spike_threshold,
+                                       window_size=self.spike_window)
+        return generate_spike_alerts(spike_mask, fs=self.spike_fs, alert_window=self.alert_window)
+
+    def nn_intervals(self, signal, fs, alerts):
+        """Step 2: (n, 2) array of the (start, end) samples of the non-noisy segments, their R-peaks and NN intervals in seconds."""
+        noise_mask = create_noise_mask(alerts, len(signal), fs)
+        segments = extract_non_noisy_segments(signal, noise_mask, self.segment_length)
+        if self.rpeak_engine == 'native':
+            all_rpeaks = detect_segment_rpeaks(signal, segments, fs)
+        else:
+            all_rpeaks = [biosppy_rpeaks(signal[start:end], fs) for start, end in segments]
+        return segments, all_rpeaks, [np.diff(rpeaks) / fs for rpeaks in all_rpeaks]
+
+    def run(self, record_path):
+        """
+        Run steps 1-4 on one record.
+        # Returns
+            dict with record, fs, alerts, segments, rpeaks, nn_intervals, analyses, abnormal (segment indexes)
+            and timings (seconds per stage)
+        """
+        timings = {}
+        t0 = time.perf_counter()
+        # Only channel 0 is read from the memory-mapped record
+        record = open_wfdb_record(record_path)
+        signal, fs = record.physical(0), record.fs
+        t1 = time.perf_counter()
+        timings['load'] = t1 - t0
+
+        alerts = self.detect_noise(signal)
+        t2 = time.perf_counter()
+        timings['noise'] = t2 - t1
+
+        segments, rpeaks, nn_intervals = self.nn_intervals(signal, fs, alerts)
+        t3 = time.perf_counter()
+        timings['nn_intervals'] = t3 - t2
+
+        analyses = analyse_nni_batch([nni * 1000 for nni in nn_intervals])
+        t4 = time.perf_counter()
+        timings['analysis'] = t4 - t3
+
+        abnormal = [i for i, analysis in enumerate(analyses) if is_abnormal_analysis(analysis)]
+        timings['total'] = time.perf_counter() - t0
+
+        return {'record': os.path.basename(record_path), 'fs': fs, 'alerts': alerts, 'segments': segments, 'rpeaks': rpeaks,
+                'nn_intervals': nn_intervals, 'analyses': analyses, 'abnormal': abnormal, 'timings': timings}
+
+    def segment_list(self, result):
+        """Lines of the segment list step4 prints: record,onset,offset in whole seconds."""
+        fs = result['fs']
+        return [f"{result['record']},{int(result['segments'][i][0] / fs)},{int(result['segments'][i][1] / fs)}" for i in result['abnormal']]
+
+    def write(self, result, output_dir='./', intermediate=False, store=False):
+        """
+        Write segment.<record>.segment.list; with intermediate, also the .alert.txt, .nni.txt and
+        .nna.txt files of the step scripts; with store, the <record>.nn.npz NN store.
+        """
+        record, fs = result['record'], result['fs']
+        os.makedirs(output_dir, exist_ok=True)
+        segment_list_file = os.path.join(output_dir, f"segment.{record}.segment.list")
+        with open(segment_list_file, 'w') as f:
+            f.writelines(line + '\n' for line in self.segment_list(result))
+
+        if store:
+            NNStore(record, fs, result['segments'], result['rpeaks'], result['alerts'], result['analyses']).save(store_path(record, output_dir))
+
+        if intermediate:
+            with open(os.path.join(output_dir, f"{record}.alert.txt"), 'w') as f:
+                for start_time, end_time in result['alerts']:
+                    f.write(f"Alert! Spike noise detected between {start_time:.2f} and {end_time:.2f} seconds.\n")
+            for (start, end), nni, analysis in zip(result['segments'], result['nn_intervals'], result['analyses']):
+                name = os.path.join(output_dir, f"{record}.{start / fs:.2f}-{end / fs:.2f}")
+                np.savetxt(f"{name}.nni.txt", nni, fmt='%.6f')
+                with open(f"{name}.nna.txt", 'w', encoding='utf-8') as f:
+                    f.write(format_analysis(analysis))
+        return segment_list_file
+
+def main():
+    parser = argparse.ArgumentParser(description='Run noise detection, NN intervals, GMM analysis and abnormal segment selection in one pass per record.')
+    parser.add_argument('records', type=str, nargs='*', help='WFDB record paths without extension, defaults to every .dat record in --data_dir')
+    parser.add_argument('--data_dir', type=str, default='./', help='Directory searched for records when none are given')
+    parser.add_argument('--output_dir', type=str, default='./', help='Directory for the segment lists (and intermediate files)')
+    parser.add_argument('--rpeak_engine', type=str, choices=['native', 'biosppy'], default='biosppy', help='R-peak detection, see step2_nn_intervals_gen.py')
+    parser.add_argument('--intermediate', action='store_true', help='Also write the .alert.txt, .nni.txt and .nna.txt files of steps 1-3')
+    parser.add_argument('--store', action='store_true', help='Also write the R-peaks, NN intervals and analyses to <record>.nn.npz')
+    args = parser.parse_args()
+
+    records = args.records or sorted(os.path.join(args.data_dir, os.path.splitext(file)[0])
+                                     for file in os.listdir(args.data_dir) if file.endswith('.dat'))
+    if not records:
+        logging.warning(f"No ECG/EKG files found in directory '{args.data_dir}'.")
+        return
+
+    pipeline = NoisyEKGPipeline(rpeak_engine=args.rpeak_engine)
+    for record_path in records:
+        try:
+            result = pipeline.run(record_path)
+            segment_list_file = pipeline.write(result, args.output_dir, args.intermediate, args.store)
+            timings = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in result['timings'].items())
+            logging.info(f"{result['record']}: {len(result['alerts'])} alerts, {len(result['segments'])} segments, "
+                         f"{len(result['abnormal'])} abnormal -> {segment_list_file} ({timings})")
+        except Exception as e:
+            logging.error(f"Error processing record '{record_path}': {str(e)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+import os
+import time
+import logging
+import argparse
+import multiprocessing
+from pipeline import NoisyEKGPipeline
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TIMING_STAGES = ('load', 'noise', 'nn_intervals', 'analysis', 'total')
+
+def find_records(sources):
+    """WFDB record paths (without extension) of the given directories and .dat/.hea/record paths."""
+    records = []
+    for source in sources:
+        if os.path.isdir(source):
+            records.extend(sorted(os.path.join(source, os.path.splitext(file)[0]) for file in os.listdir(source) if file.endswith('.dat')))
+        else:
+            records.append(os.path.splitext(source)[0] if source.endswith(('.dat', '.hea')) else source)
+    return records
+
+_pipeline = None
+
+def init_worker(rpeak_engine='biosppy'):
+    """One NoisyEKGPipeline per process."""
+    global _pipeline
+    _pipeline = NoisyEKGPipeline(rpeak_engine=rpeak_engine)
+
+def screen_task(task):
+    """
+    Screen one record into its own output directory and return (record, segment lines, timings, error);
+    errors are reported, not raised.
+    """
+    record_path, output_dir, intermediate, store = task
+    record = os.path.basename(record_path)
+    t0 = time.perf_counter()
+    try:
+        result = _pipeline.run(record_path)
+        _pipeline.write(result, os.path.join(output_dir, record), intermediate, store)
+        timings = dict(result['timings'], alerts=len(result['alerts']), segments=len(result['segments']), abnormal=len(result['abnormal']))
+        lines, error = _pipeline.segment_list(result), None
+    except Exception as e:
+        lines, timings, error = [], {}, str(e).strip()
+    timings['wall'] = time.perf_counter() - t0
+    return record, lines, timings, error
+
+def screen_records(records, output_dir, workers=1, rpeak_engine='biosppy', intermediate=False, store=False):
+    """
+    Screen all records, in this process when workers is 1, otherwise one record per task over a process pool.
+
+    Every record writes to output_dir/<record>/, so records never share files; results come back
+    in record order either way.
+    """
+    tasks = [(record_path, output_dir, intermediate, store) for record_path in records]
+    if workers <= 1:
+        init_worker(rpeak_engine)
+        results = map(screen_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(rpeak_engine,))
+        results = pool.imap(screen_task, tasks, chunksize=1)
+
+    collected = []
+    try:
+        for record, lines, timings, error in results:
+            if error is None:
+                logging.info(f"Screened {record}: {timings['segments']} segments, {timings['abnormal']} abnormal in {timings['wall']:.2f}s")
+            else:
+                logging.error(f"Error processing record '{record}' after {timings['wall']:.2f}s: {error}")
+            collected.append((record, lines, timings, error))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return collected
+
+def write_summary(collected, output_dir):
+    """Write the consolidated segment.list and a timings.csv with one row per record."""
+    segment_list_file = os.path.join(output_dir, 'segment.list')
+    with open(segment_list_file, 'w') as f:
+        for _, lines, _, _ in collected:
+            f.writelines(line + '\n' for line in lines)
+
+    timings_file = os.path.join(output_dir, 'timings.csv')
+    with open(timings_file, 'w') as f:
+        f.write(','.join(('record', 'alerts', 'segments', 'abnormal') + TIMING_STAGES + ('wall', 'error')) + '\n')
+        for record, _, timings, error in collected:
+            counts = [str(timings.get(key, '')) for key in ('alerts', 'segments', 'abnormal')]
+            seconds = [f"{timings[key]:.3f}" if key in timings else '' for key in TIMING_STAGES + ('wall',)]
+            f.write(','.join([record] + counts + seconds + [(error or '').replace(',', ';')]) + '\n')
+    return segment_list_file, timings_file
+
+def main():
+    parser = argparse.ArgumentParser(description='Screen a directory of WFDB records for potential arrhythmia, one record per worker.')
+    parser.add_argument('inputs', type=str, nargs='*', default=['./'], help='Directories of records or record paths')
+    parser.add_argument('--output_dir', type=str, default='screening', help='Each record writes to <output_dir>/<record>/, plus segment.list and timings.csv')
+    parser.add_argument('--workers', type=int, default=0, help='Number of processes, 0 means one per CPU core')
+    parser.add_argument('--rpeak_engine', type=str, choices=['native', 'biosppy'], default='biosppy', help='R-peak detection, see step2_nn_intervals_gen.py')
+    parser.add_argument('--intermediate', action='store_true', help='Also write the .alert.txt, .nni.txt and .nna.txt files of steps 1-3')
+    parser.add_argument('--store', action='store_true', help='Also write the R-peaks, NN intervals and analyses to <record>.nn.npz')
+    args = parser.parse_args()
+
+    records = find_records(args.inputs)
+    if not records:
+        logging.warning(f"No records found in {args.inputs}.")
+        return
+
+    workers = args.workers or os.cpu_count() or 1
+    workers = min(workers, len(records))
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    collected = screen_records(records, args.output_dir, workers, args.rpeak_engine, args.intermediate, args.store)
+    elapsed = time.perf_counter() - t0
+    segment_list_file, timings_file = write_summary(collected, args.output_dir)
+
+    failed = sum(error is not None for _, _, _, error in collected)
+    busy = sum(timings['wall'] for _, _, timings, _ in collected)
+    abnormal = sum(len(lines) for _, lines, _, _ in collected)
+    logging.info(f"Screened {len(records) - failed}/{len(records)} records with {workers} workers in {elapsed:.2f}s "
+                 f"({busy:.2f}s of record time), {abnormal} abnormal segments -> {segment_list_file}, {timings_file}")
+
+if __name__ == '__main__':
+    main()
@@ -1,40 +1,77 @@
 import os
-import wfdb
+import warnings
+from ecg_plot.wfdb_reader import open_wfdb_record
 import numpy as np
+from scipy.ndimage import median_filter
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def detect_ekg_spikes(signal, fs=240, median_signal=5, threshold=50, window_size=60):
+def rolling_median(signal, fs, window_size=60, resolution=0.25):
     """
-    Detect spike noise in an ECG/EKG signal using amplitude thresholding.
+    Running median over window_size seconds, evaluated on blocks of resolution seconds.
+
+    Each block is reduced to its median, the block medians go through a median filter of
+    window_size / resolution blocks, and the result is interpolated back to every sample.
     """
-    window_size = 60 * fs
-    
-    diff_signal = signal - median_signal
-    spike_mask = np.abs(diff_signal) > threshold
-    
-    return spike_mask
+    block = max(int(resolution * fs), 1)
+    num_blocks = -(-len(signal) // block)
+    padded = np.full(num_blocks * block, np.nan)
+    padded[:len(signal)] = signal
+    blocks = padded.reshape(num_blocks, block)
+    # Middle order statistic of each block (upper median for even blocks), nanmedian only for blocks with NaN
+    block_medians = np.partition(blocks, block // 2, axis=1)[:, block // 2]
+    has_nan = np.isnan(blocks).any(axis=1)
+    if has_nan.any():
+        with warnings.catch_warnings():
+            # All-NaN blocks stay NaN and are interpolated below
+            warnings.simplefilter('ignore', RuntimeWarning)
+            block_medians[has_nan] = np.nanmedian(blocks[has_nan], axis=1)
+    valid = ~np.isnan(block_medians)
+    if not valid.any():
+        return np.full(len(signal), np.nan)
+    block_medians = np.interp(np.arange(num_blocks), np.flatnonzero(valid), block_medians[valid])
+
+    window_blocks = max(int(window_size / resolution) | 1, 1)
+    smoothed = median_filter(block_medians, size=window_blocks, mode='nearest')
+    centres = np.arange(num_blocks) * block + (block - 1) / 2.0
+    return np.interp(np.arange(len(signal)), centres, smoothed)
+
+def detect_ekg_spikes(signal, fs=240, median_signal=5, threshold=50, window_size=60, mad_threshold=8, resolution=0.25):
+    """
+    Detect spike noise in an ECG/EKG signal using amplitude thresholding against a running baseline.
+
+    A sample is a spike when it deviates from the running median over window_size seconds by more
+    than threshold and by more than mad_threshold robust SDs (1.4826 * running MAD), so baseline
+    wander neither raises nor hides alerts. With window_size 0 the fixed median_signal baseline
+    is used instead.
+    """
+    if not window_size:
+        return np.abs(signal - median_signal) > threshold
+
+    deviation = np.abs(signal - rolling_median(signal, fs, window_size, resolution))
+    robust_sd = 1.4826 * rolling_median(deviation, fs, window_size, resolution)
+    # NaN samples compare False, they are never spikes
+    return (deviation > threshold) & (deviation > mad_threshold * robust_sd)
 
 def generate_spike_alerts(spike_mask, fs, alert_window=5*60): 
     """
     Generate alerts every 'alert_window' seconds if any spike is detected. (default: every 5 min)
+    The trailing partial window is included and ends at the end of the signal.
+    Returns an (n, 2) array of alert (start, end) times in seconds.
     """
     alert_window_samples = alert_window * fs
     num_windows = len(spike_mask) // alert_window_samples
-    
-    alerts = []
-    for i in range(num_windows):
-        start = i * alert_window_samples
-        end = start + alert_window_samples
-        window_spike_mask = spike_mask[start:end]
-        if np.any(window_spike_mask):
-            start_time = start / fs
-            end_time = end / fs
-            alerts.append((start_time, end_time))
-    
-    return alerts
+
+    # Any spike per full window, then the partial tail window
+    flagged = spike_mask[:num_windows * alert_window_samples].reshape(num_windows, alert_window_samples).any(axis=1)
+    if len(spike_mask) > num_windows * alert_window_samples:
+        flagged = np.append(flagged, spike_mask[num_windows * alert_window_samples:].any())
+
+    start = np.flatnonzero(flagged) * alert_window_samples
+    end = np.minimum(start + alert_window_samples, len(spike_mask))
+    return np.column_stack([start, end]) / fs
 
 def process_ekg_files(data_dir):
     """
@@ -60,10 +97,11 @@ def process_ekg_files(data_dir):
         
         try:
             # Load the ECG/EKG record
-            signals, fields = wfdb.rdsamp(record_path)
+            # Only channel 0 is read from the memory-mapped record
+            signal = open_wfdb_record(record_path).physical(0)
             
             # Detect spike noise and generate alerts every 10 min
-            spike_mask = detect_ekg_spikes(signal=signals[:, 0], fs=240, median_signal=5, threshold=50, window_size=60)
+            spike_mask = detect_ekg_spikes(signal=signal, fs=240, median_signal=5, threshold=50, window_size=60)
             alerts = generate_spike_alerts(spike_mask, fs=240, alert_window=5*60)
 
             # Write alerts to a log file
@@ -77,8 +115,9 @@ def process_ekg_files(data_dir):
         except Exception as e:
             logging.error(f"Error processing file '{filename}': {str(e)}")
 
-# Specify the directory containing the ECG/EKG files
-data_dir = './'
+if __name__ == '__main__':
+    # Specify the directory containing the ECG/EKG files
+    data_dir = './'
 
-# Process ECG/EKG files and generate spike noise alerts
-process_ekg_files(data_dir)
+    # Process ECG/EKG files and generate spike noise alerts
+    process_ekg_files(data_dir)
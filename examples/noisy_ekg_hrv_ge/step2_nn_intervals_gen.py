@@ -1,7 +1,9 @@
 import os
-import wfdb
+import argparse
+from ecg_plot.wfdb_reader import open_wfdb_record
+from ecg_plot.rpeaks import detect_segment_rpeaks, biosppy_rpeaks, benchmark
+from nn_store import NNStore, store_path
 import numpy as np
-from biosppy.signals import ecg
 import logging
 
 # Configure logging
@@ -17,30 +19,76 @@ def load_alerts(alert_file):
             alerts.append((start, end))
     return alerts
 
+def noise_intervals(alerts, signal_length, fs):
+    """
+    Sorted, non-overlapping (n, 2) array of the (start, end) samples covered by alerts,
+    alerts is a list or (n, 2) array of (start, end) seconds.
+    """
+    alerts = np.asarray(alerts, dtype=np.float64).reshape(-1, 2)
+    start_sample = np.clip((alerts[:, 0] * fs).astype(np.int64), 0, signal_length)
+    end_sample = np.clip((alerts[:, 1] * fs).astype(np.int64), 0, signal_length)
+    keep = end_sample > start_sample
+    order = np.argsort(start_sample[keep], kind='stable')
+    start_sample, end_sample = start_sample[keep][order], end_sample[keep][order]
+    if len(start_sample) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    # An alert starting after every earlier alert has ended opens a new interval,
+    # which ends at the furthest end seen before the next one opens
+    reach = np.maximum.accumulate(end_sample)
+    opens = np.r_[True, start_sample[1:] > reach[:-1]]
+    closes = np.r_[opens[1:], True]
+    return np.column_stack([start_sample[opens], reach[closes]])
+
 def create_noise_mask(alerts, signal_length, fs):
-    noise_mask = np.zeros(signal_length, dtype=bool)
-    for start, end in alerts:
-        start_sample = int(start * fs)
-        end_sample = int(end * fs)
-        noise_mask[start_sample:end_sample] = True
-    return noise_mask
+    """
+    Boolean mask of the samples inside any alert, run-length decoded from noise_intervals().
+    """
+    edges = np.concatenate([[0], noise_intervals(alerts, signal_length, fs).ravel(), [signal_length]])
+    # Runs alternate clean, noisy, clean, ... between the interval edges
+    runs = np.diff(edges)
+    return np.repeat(np.arange(len(runs)) % 2 == 1, runs)
 
 def extract_non_noisy_segments(signal, noise_mask, segment_length):
-    non_noisy_segments = []
-    start = 0
-    while start < len(signal):
-        end = start + segment_length
-        if end > len(signal):
-            end = len(signal)
-        segment_mask = noise_mask[start:end]
-        if not np.any(segment_mask):
-            non_noisy_segments.append((signal[start:end], start, end))
-        start = end
-    return non_noisy_segments
-
-def calculate_nn_intervals(non_noisy_segments, fs, record_name):
-    for segment, start, end in non_noisy_segments:
-        rpeaks = ecg.ecg(segment, fs, show=False)[2]
+    """
+    (n, 2) array of the (start, end) samples of the segment_length segments without any noise,
+    the last segment may be shorter.
+    """
+    num_segments = -(-len(signal) // segment_length)
+    full = len(signal) // segment_length
+    noisy = noise_mask[:full * segment_length].reshape(full, segment_length).any(axis=1)
+    if num_segments > full:
+        noisy = np.append(noisy, noise_mask[full * segment_length:len(signal)].any())
+
+    start = np.flatnonzero(~noisy) * segment_length
+    end = np.minimum(start + segment_length, len(signal))
+    return np.column_stack([start, end])
+
+def calculate_nn_intervals(signal, non_noisy_segments, fs, record_name, rpeak_engine='biosppy', compare=False, alerts=None, text=False):
+    """
+    Save the R-peaks and NN intervals of each (start, end) segment of signal to the record's NN store
+    (<record>.nn.npz), or with text to one .nni.txt file per segment. The biosppy engine (the default) runs
+    biosppy.signals.ecg per segment; the native engine detects R-peaks over whole runs of adjacent segments
+    of signal at once. With compare, both run and the speedup and R-peak agreement are logged.
+    """
+    bounds = [(start, end) for start, end in non_noisy_segments]
+    if compare:
+        native, reference, agreement = benchmark(signal, bounds, fs)
+        logging.info(f"{record_name}: native {agreement['native_seconds']:.2f}s, biosppy {agreement['biosppy_seconds']:.2f}s "
+                     f"({agreement['speedup']:.1f}x), {agreement['test']} vs {agreement['reference']} R-peaks, "
+                     f"sensitivity {agreement['sensitivity']:.4f} ppv {agreement['ppv']:.4f} offset {agreement['offset_ms']:.1f} ms")
+        all_rpeaks = native if rpeak_engine == 'native' else reference
+    elif rpeak_engine == 'native':
+        all_rpeaks = detect_segment_rpeaks(signal, bounds, fs)
+    else:
+        all_rpeaks = [biosppy_rpeaks(signal[start:end], fs) for start, end in bounds]
+
+    if not text:
+        output_file = NNStore(record_name, fs, bounds, all_rpeaks, alerts).save(store_path(record_name))
+        logging.info(f"R-peaks and NN intervals of {len(bounds)} segments saved to {output_file}")
+        return
+
+    for rpeaks, (start, end) in zip(all_rpeaks, bounds):
         nn_intervals = np.diff(rpeaks) / fs
         
         start_time = start / fs
@@ -51,7 +99,7 @@ def calculate_nn_intervals(non_noisy_segments, fs, record_name):
         np.savetxt(output_file, nn_intervals, fmt='%.6f')
         logging.info(f"NN intervals saved to {output_file}")
 
-def process_ekg_files(data_dir, segment_length):
+def process_ekg_files(data_dir, segment_length, rpeak_engine='biosppy', compare=False, text=False):
     """
     Process ECG/EKG files in the specified directory, mask noise periods, and calculate NN intervals.
     """
@@ -75,21 +123,23 @@ def process_ekg_files(data_dir, segment_length):
         
         try:
             # Load the ECG/EKG record
-            signals, fields = wfdb.rdsamp(record_path)
-            fs = fields['fs']
+            # Only channel 0 is read from the memory-mapped record
+            record = open_wfdb_record(record_path)
+            signal = record.physical(0)
+            fs = record.fs
             
             # Load alerts
             alert_file = f"{record_name}.alert.txt"
             alerts = load_alerts(os.path.join(data_dir, alert_file))
             
             # Create noise mask
-            noise_mask = create_noise_mask(alerts, len(signals), fs)
+            noise_mask = create_noise_mask(alerts, len(signal), fs)
             
             # Extract non-noisy segments
-            non_noisy_segments = extract_non_noisy_segments(signals[:, 0], noise_mask, segment_length)
+            non_noisy_segments = extract_non_noisy_segments(signal, noise_mask, segment_length)
             
             # Calculate NN intervals for each non-noisy segment
-            calculate_nn_intervals(non_noisy_segments, fs, record_name)
+            calculate_nn_intervals(signal, non_noisy_segments, fs, record_name, rpeak_engine, compare, alerts, text)
             
             logging.info(f"Processed file: {filename}")
         except FileNotFoundError:
@@ -97,11 +147,19 @@ def process_ekg_files(data_dir, segment_length):
         except Exception as e:
             logging.error(f"Error processing file '{filename}': {str(e)}")
 
-# Specify the directory containing the ECG/EKG files
-data_dir = './'
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate NN intervals of the non-noisy segments of each record.')
+    parser.add_argument('--rpeak_engine', type=str, choices=['native', 'biosppy'], default='biosppy',
+                        help='biosppy: biosppy.signals.ecg per segment (default); native: detect R-peaks over whole clean stretches with ecg_plot.rpeaks, check it with --compare first')
+    parser.add_argument('--compare', action='store_true', help='Run both engines, log the speedup and R-peak agreement')
+    parser.add_argument('--text', action='store_true', help='Write one .nni.txt file per segment instead of the <record>.nn.npz store')
+    args = parser.parse_args()
+
+    # Specify the directory containing the ECG/EKG files
+    data_dir = './'
 
-# Specify the desired segment length (in samples)
-segment_length = 5 * 60 * 250  # 5 minutes at 250 Hz sampling rate
+    # Specify the desired segment length (in samples)
+    segment_length = 5 * 60 * 250  # 5 minutes at 250 Hz sampling rate
 
-# Process ECG/EKG files, mask noise periods, and calculate NN intervals
-process_ekg_files(data_dir, segment_length)
+    # Process ECG/EKG files, mask noise periods, and calculate NN intervals
+    process_ekg_files(data_dir, segment_length, args.rpeak_engine, args.compare, args.text)
@@ -1,82 +1,263 @@
 # Import packages
 import os
-import pyhrv.time_domain as td
+import argparse
+import multiprocessing
 import numpy as np
-from sklearn.mixture import GaussianMixture
 from scipy.stats import kurtosis
+from nn_store import NNStore, list_stores
 
-# Get the list of files with '.nni.txt' extension in the current directory
-nni_files = [file for file in os.listdir() if file.endswith('.nni.txt')]
+def _gaussian_log_prob(x, means, variances, weights):
+    """Weighted log density of every sample under every component, shape (segments, samples, components)."""
+    return (-0.5 * (np.log(2 * np.pi * variances[:, None, :]) + (x[:, :, None] - means[:, None, :]) ** 2 / variances[:, None, :])
+            + np.log(weights[:, None, :]))
 
-# Process each NNI file
-for nni_file in nni_files:
-    # Load sample data
-    nni_data = np.loadtxt(nni_file) * 1000
+def _m_step(x, valid, resp, reg_covar):
+    resp = resp * valid[:, :, None]
+    nk = resp.sum(axis=1) + 10 * np.finfo(np.float64).eps
+    means = (resp * x[:, :, None]).sum(axis=1) / nk
+    variances = (resp * (x[:, :, None] - means[:, None, :]) ** 2).sum(axis=1) / nk + reg_covar
+    return means, variances, nk / nk.sum(axis=1, keepdims=True)
+
+def _e_step(x, valid, means, variances, weights):
+    log_prob = _gaussian_log_prob(x, means, variances, weights)
+    log_norm = np.logaddexp.reduce(log_prob, axis=2)
+    lower_bound = (log_norm * valid).sum(axis=1) / valid.sum(axis=1)
+    return log_prob, log_norm, lower_bound
+
+def pearson_kurtosis(data):
+    """scipy.stats.kurtosis(data, fisher=False)[0] of (n, 1) data, without its per-call overhead."""
+    deviation = data - data.mean()
+    m2 = np.mean(deviation ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.mean(deviation ** 4) / m2 ** 2
+
+def fit_gmm_1d_batch(x, valid, n_components, max_iter=100, tol=1e-3, reg_covar=1e-6):
+    """
+    Fit a 1-D Gaussian mixture to every row of x at once, EM as in sklearn's GaussianMixture.
+
+    Every row is initialised with 1-D k-means started from its quantiles (no randomness), then runs
+    EM until its mean log-likelihood changes by less than tol; converged rows are frozen.
+    Components are ordered by mean.
+    # Arguments
+        x    : (segments, samples) values, padding entries are ignored
+        valid: (segments, samples) bool, which entries of x are samples
+    # Returns
+        means, variances, weights: (segments, n_components) arrays
+        labels: (segments, samples) most likely component of every sample
+        bic   : (segments,) Bayesian information criterion of every fit
+    """
+    count = valid.sum(axis=1)
+    # 1-D k-means: centres at the quantiles, samples go to the nearest centre
+    ordered = np.sort(np.where(valid, x, np.inf), axis=1)
+    position = ((np.arange(n_components) + 0.5) / n_components)[None, :] * (count[:, None] - 1)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, count[:, None] - 1)
+    centres = (np.take_along_axis(ordered, below, axis=1) * (1 - (position - below))
+               + np.take_along_axis(ordered, above, axis=1) * (position - below))
+    labels = np.zeros(x.shape, dtype=np.int64)
+    for iteration in range(100):
+        new_labels = np.argmin(np.abs(x[:, :, None] - centres[:, None, :]), axis=2)
+        if iteration > 0 and np.array_equal(new_labels[valid], labels[valid]):
+            break
+        labels = new_labels
+        one_hot = (labels[:, :, None] == np.arange(n_components)) & valid[:, :, None]
+        sizes = one_hot.sum(axis=1)
+        centres = np.where(sizes > 0, (one_hot * x[:, :, None]).sum(axis=1) / np.maximum(sizes, 1), centres)
+    resp = (labels[:, :, None] == np.arange(n_components)).astype(np.float64)
+
+    means, variances, weights = _m_step(x, valid, resp, reg_covar)
+    lower_bound = np.full(len(x), -np.inf)
+    active = np.ones(len(x), dtype=bool)
+    for _ in range(max_iter):
+        log_prob, log_norm, new_lower_bound = _e_step(x[active], valid[active], means[active], variances[active], weights[active])
+        resp = np.exp(log_prob - log_norm[:, :, None])
+        new_means, new_variances, new_weights = _m_step(x[active], valid[active], resp, reg_covar)
+        means[active], variances[active], weights[active] = new_means, new_variances, new_weights
+        converged = np.abs(new_lower_bound - lower_bound[active]) < tol
+        lower_bound[active] = new_lower_bound
+        active[np.flatnonzero(active)[converged]] = False
+        if not active.any():
+            break
+
+    order = np.argsort(means, axis=1)
+    means, variances, weights = (np.take_along_axis(a, order, axis=1) for a in (means, variances, weights))
+    log_prob, _, score = _e_step(x, valid, means, variances, weights)
+    labels = np.argmax(log_prob, axis=2)
+    bic = -2 * score * count + (3 * n_components - 1) * np.log(count)
+    return means, variances, weights, labels, bic
+
+def analyse_nni_batch(nni_list, min_nni=300, max_nni=1200, min_samples=3, min_distribution_samples=60):
+    """
+    Fit GMMs with 1 and 2 components to the NN intervals (ms) of many segments and describe the
+    distributions found. The fits of all segments run as one batched EM, and the winner of the
+    BIC sweep is kept rather than refitted.
+
+    Returns one dict per segment with 'samples' (after removing anomalies) and, when there are
+    enough of them, 'best_n_components', 'num_valid_distributions' and 'distributions': a list of
+    (index, kurtosis, mean, std) for every distribution with at least min_distribution_samples.
+    """
+    # Remove anomalies based on a specified range
+    nni_list = [np.asarray(nni_data, dtype=np.float64).ravel() for nni_data in nni_list]
+    nni_list = [nni_data[(nni_data >= min_nni) & (nni_data <= max_nni)] for nni_data in nni_list]
+    analyses = [{'samples': len(nni_data)} for nni_data in nni_list]
+
+    # Check if there are enough samples after removing anomalies
+    fitted = [i for i, nni_data in enumerate(nni_list) if len(nni_data) >= min_samples]
+    if not fitted:
+        return analyses
+
+    # Segments side by side, padded to the longest one
+    valid = np.zeros((len(fitted), max(len(nni_list[i]) for i in fitted)), dtype=bool)
+    x = np.zeros(valid.shape)
+    for row, i in enumerate(fitted):
+        valid[row, :len(nni_list[i])] = True
+        x[row, :len(nni_list[i])] = nni_list[i]
+
+    # Fit GMMs with different numbers of components, keep the one with the lowest BIC
+    n_components_range = range(1, 3)  # Range of components to try (1 to 2)
+    fits = [fit_gmm_1d_batch(x, valid, n_components) for n_components in n_components_range]
+    best = np.argmin(np.stack([fit[4] for fit in fits]), axis=0)
+
+    for row, i in enumerate(fitted):
+        best_n_components = n_components_range[best[row]]
+        labels = fits[best[row]][3][row, :len(nni_list[i])]
+        nni_data = nni_list[i].reshape(-1, 1)
+        analyses[i]['best_n_components'] = best_n_components
+
+        # Ignore distributions with fewer than 60 samples
+        valid_distributions = np.bincount(labels, minlength=best_n_components) >= min_distribution_samples
+        analyses[i]['num_valid_distributions'] = int(np.sum(valid_distributions))
+
+        # Kurtosis, mean and SD of each valid distribution
+        analyses[i]['distributions'] = []
+        for k in range(best_n_components):
+            if valid_distributions[k]:
+                distribution_data = nni_data[labels == k]
+                analyses[i]['distributions'].append((k, pearson_kurtosis(distribution_data),
+                                                     np.mean(distribution_data), np.std(distribution_data)))
+    return analyses
+
+def analyse_nni(nni_data, min_nni=300, max_nni=1200, min_samples=3, min_distribution_samples=60):
+    """
+    Fit GMMs with 1 and 2 components to NN intervals (ms) of one segment, see analyse_nni_batch().
+    """
+    return analyse_nni_batch([nni_data], min_nni, max_nni, min_samples, min_distribution_samples)[0]
+
+def analyse_nni_sklearn(nni_data, min_nni=300, max_nni=1200, min_samples=3, min_distribution_samples=60, random_state=0):
+    """
+    The previous sklearn GaussianMixture analysis of one segment, seeded, with the BIC winner kept.
+    """
+    from sklearn.mixture import GaussianMixture
 
     # Remove anomalies based on a specified range
-    min_nni = 300  # Minimum valid NNI value
-    max_nni = 1200  # Maximum valid NNI value
     nni_data = nni_data[(nni_data >= min_nni) & (nni_data <= max_nni)]
 
-    # Open a file for writing the output
-    output_file = nni_file.replace('.nni.txt', '.nna.txt')
-    print(f"Analysis results for {nni_file} saved to: {output_file}")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        # Check if there are enough samples after removing anomalies
-        min_samples = 3  # Minimum number of samples required for GMM (e.g. 1 min arrhy)
-        if len(nni_data) < min_samples:
-            f.write(f"Insufficient samples ({len(nni_data)}) after removing anomalies. Skipping GMM fitting.\n")
+    analysis = {'samples': len(nni_data)}
+    # Check if there are enough samples after removing anomalies
+    if len(nni_data) < min_samples:
+        return analysis
+
+    # Reshape the data for GMM
+    nni_data = nni_data.reshape(-1, 1)
+
+    # Fit GMMs with different numbers of components, keep the one with the lowest BIC
+    gmms = [GaussianMixture(n_components=n_components, random_state=random_state).fit(nni_data) for n_components in range(1, 3)]
+    best_gmm = min(gmms, key=lambda gmm: gmm.bic(nni_data))
+    best_n_components = best_gmm.n_components
+    analysis['best_n_components'] = best_n_components
+
+    # Get the number of samples assigned to each distribution
+    labels = best_gmm.predict(nni_data)
+    sample_counts = np.bincount(labels)
+
+    # Ignore distributions with fewer than 60 samples
+    valid_distributions = sample_counts >= min_distribution_samples
+    analysis['num_valid_distributions'] = int(np.sum(valid_distributions))
+
+    # Kurtosis, mean and SD of each valid distribution
+    analysis['distributions'] = []
+    for i in range(best_n_components):
+        if i < len(valid_distributions) and valid_distributions[i]:
+            distribution_data = nni_data[labels == i]
+            analysis['distributions'].append((i, kurtosis(distribution_data, fisher=False)[0],
+                                              np.mean(distribution_data), np.std(distribution_data)))
+    return analysis
+
+def format_analysis(analysis):
+    """Text of the .nna.txt report for an analyse_nni() result."""
+    if 'best_n_components' not in analysis:
+        return f"Insufficient samples ({analysis['samples']}) after removing anomalies. Skipping GMM fitting.\n"
+
+    lines = [f"Optimal number of distributions: {analysis['best_n_components']}\n"]
+    num_valid_distributions = analysis['num_valid_distributions']
+    if num_valid_distributions == 0:
+        lines.append("No valid distributions found (all distributions have fewer than 60 samples).\n")
+        return ''.join(lines)
+
+    lines.append(f"Number of valid distributions: {num_valid_distributions}\n")
+    if num_valid_distributions == 1:
+        lines.append("The NNI data likely follows 1 distribution.\n")
+    else:
+        lines.append(f"The NNI data likely follows {num_valid_distributions} distributions.\n")
+
+    for i, distribution_kurtosis, distribution_mean, distribution_std in analysis['distributions']:
+        lines.append(f"Distribution {i+1}:\n")
+        lines.append(f"  Kurtosis: {distribution_kurtosis:.2f}\n")
+        lines.append(f"  Mean: {distribution_mean:.2f} ms\n")
+        lines.append(f"  Standard Deviation: {distribution_std:.2f} ms\n")
+        lines.append(f"  1-SD Range: [{distribution_mean - distribution_std:.2f}, {distribution_mean + distribution_std:.2f}] ms\n")
+        lines.append(f"  2-SD Range: [{distribution_mean - 2*distribution_std:.2f}, {distribution_mean + 2*distribution_std:.2f}] ms\n")
+    return ''.join(lines)
+
+def analyse_nni_files(nni_files, gmm='em', workers=1, batch_size=256):
+    """
+    Analyse .nni.txt files (NN intervals in seconds) and write the .nna.txt report next to each.
+
+    With gmm 'em', batches of batch_size files are fitted together, over a process pool when
+    workers > 1; 'sklearn' fits every file with analyse_nni_sklearn().
+    """
+    # Load sample data
+    nni_list = [np.loadtxt(nni_file, ndmin=1) * 1000 for nni_file in nni_files]
+
+    if gmm == 'sklearn':
+        analyses = [analyse_nni_sklearn(nni_data) for nni_data in nni_list]
+    else:
+        batches = [nni_list[i:i + batch_size] for i in range(0, len(nni_list), batch_size)]
+        if workers > 1 and len(batches) > 1:
+            with multiprocessing.Pool(min(workers, len(batches))) as pool:
+                results = pool.map(analyse_nni_batch, batches)
         else:
-            # Reshape the data for GMM
-            nni_data = nni_data.reshape(-1, 1)
-
-            # Fit GMMs with different numbers of components
-            n_components_range = range(1, 3)  # Range of components to try (1 to 2)
-            bic_values = []
-
-            for n_components in n_components_range:
-                gmm = GaussianMixture(n_components=n_components)
-                gmm.fit(nni_data)
-                bic_values.append(gmm.bic(nni_data))
-
-            # Find the optimal number of components based on BIC
-            best_n_components = n_components_range[np.argmin(bic_values)]
-
-            f.write(f"Optimal number of distributions: {best_n_components}\n")
-
-            # Fit the GMM with the optimal number of components
-            best_gmm = GaussianMixture(n_components=best_n_components)
-            best_gmm.fit(nni_data)
-
-            # Get the number of samples assigned to each distribution
-            labels = best_gmm.predict(nni_data)
-            sample_counts = np.bincount(labels)
-
-            # Ignore distributions with fewer than 60 samples
-            valid_distributions = sample_counts >= 60
-            num_valid_distributions = np.sum(valid_distributions)
-
-            if num_valid_distributions == 0:
-                f.write("No valid distributions found (all distributions have fewer than 60 samples).\n")
-            else:
-                f.write(f"Number of valid distributions: {num_valid_distributions}\n")
-
-                if num_valid_distributions == 1:
-                    f.write("The NNI data likely follows 1 distribution.\n")
-                else:
-                    f.write(f"The NNI data likely follows {num_valid_distributions} distributions.\n")
-
-                # Calculate and print kurtosis, 1-SD, and 2-SD for each valid distribution
-                for i in range(best_n_components):
-                    if i < len(valid_distributions) and valid_distributions[i]:
-                        distribution_data = nni_data[labels == i]
-                        distribution_kurtosis = kurtosis(distribution_data, fisher=False)[0]
-                        distribution_mean = np.mean(distribution_data)
-                        distribution_std = np.std(distribution_data)
-                        f.write(f"Distribution {i+1}:\n")
-                        f.write(f"  Kurtosis: {distribution_kurtosis:.2f}\n")
-                        f.write(f"  Mean: {distribution_mean:.2f} ms\n")
-                        f.write(f"  Standard Deviation: {distribution_std:.2f} ms\n")
-                        f.write(f"  1-SD Range: [{distribution_mean - distribution_std:.2f}, {distribution_mean + distribution_std:.2f}] ms\n")
-                        f.write(f"  2-SD Range: [{distribution_mean - 2*distribution_std:.2f}, {distribution_mean + 2*distribution_std:.2f}] ms\n")
+            results = map(analyse_nni_batch, batches)
+        analyses = [analysis for batch in results for analysis in batch]
+
+    for nni_file, analysis in zip(nni_files, analyses):
+        # Open a file for writing the output
+        output_file = nni_file.replace('.nni.txt', '.nna.txt')
+        print(f"Analysis results for {nni_file} saved to: {output_file}")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(format_analysis(analysis))
+
+def analyse_stores(store_files, gmm='em'):
+    """Analyse the segments of every NN store and save the analyses into the store."""
+    for store_file in store_files:
+        store = NNStore.load(store_file)
+        nni_list = [nni * 1000 for nni in store.all_nn_intervals()]
+        if gmm == 'sklearn':
+            store.analyses = [analyse_nni_sklearn(nni_data) for nni_data in nni_list]
+        else:
+            store.analyses = analyse_nni_batch(nni_list)
+        store.save(store_file)
+        print(f"Analysis results for {len(store)} segments saved to: {store_file}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Analyse the NN interval distribution of every .nni.txt file in the current directory.')
+    parser.add_argument('--gmm', type=str, choices=['em', 'sklearn'], default='em', help="'em': batched 1-D EM, 'sklearn': one GaussianMixture per file")
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes for the batches')
+    args = parser.parse_args()
+
+    # Get the list of files with '.nni.txt' extension in the current directory
+    nni_files = [file for file in os.listdir() if file.endswith('.nni.txt')]
 
+    # Process the NNI files and the NN stores
+    analyse_nni_files(nni_files, args.gmm, args.workers)
+    analyse_stores(list_stores(), args.gmm)
@@ -1,5 +1,6 @@
 import os
 import re
+from nn_store import NNStore, list_stores
 
 def is_abnormal(filename):
 
@@ -24,6 +25,12 @@ def is_abnormal(filename):
                     return True
         return False
 
+def is_abnormal_analysis(analysis):
+    """Check an analysis dict of step3_nn_hist_analysis.analyse_nni() against the same criteria."""
+    # The report says "follows N distributions" (plural) only for N >= 2, so as in is_abnormal()
+    # a single distribution is never flagged on its kurtosis
+    return analysis.get('num_valid_distributions', 0) >= 2
+
 def list_abnormal_filenames():
     """List filenames that meet the abnormal criteria."""
     abnormal_filenames = []
@@ -36,6 +43,16 @@ def list_abnormal_filenames():
 
     return abnormal_filenames
 
+def list_abnormal_segments(directory='./'):
+    """record,onset,offset lines of the abnormal segments in the NN stores analysed by step3."""
+    lines = []
+    for store_file in list_stores(directory):
+        store = NNStore.load(store_file)
+        for (start, end), analysis in zip(store.segments, store.analyses or []):
+            if is_abnormal_analysis(analysis):
+                lines.append(f"{store.record},{int(start / store.fs)},{int(end / store.fs)}")
+    return lines
+
 def parse_filename(filename):
     """
     Parses the filename in the format 'CaseXXX.YYYY.ZZ-YYYY.ZZ.nna.txt'
@@ -57,7 +74,10 @@ def parse_filename(filename):
         # If the filename does not match the expected pattern
         return None
 
-# Execute the function and print out the abnormal filenames
-abnormal_filenames = list_abnormal_filenames()
-for filename in abnormal_filenames:
-    print(parse_filename(filename))
+if __name__ == '__main__':
+    # Execute the function and print out the abnormal filenames
+    abnormal_filenames = list_abnormal_filenames()
+    for filename in abnormal_filenames:
+        print(parse_filename(filename))
+    for line in list_abnormal_segments():
+        print(line)
@@ -1,30 +1,25 @@
-import os
-import sys
+import argparse
+import logging
+from ecg_plot.segment_renderer import render_segment_list
 
-def chunk_segments(filename, onset, offset, chunk_size=30):
-    """Generate onset and offset pairs for each 30-second chunk within a segment."""
-    duration = offset - onset
-    for start in range(onset, offset, chunk_size):
-        yield filename, start, min(start + chunk_size, offset)
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def main(segment_list_file, ekg_channel_id):
-    # Open and read the segment list file
-    with open(segment_list_file, 'r') as file:
-        segments = file.readlines()
-
-    # Iterate over each segment
-    for segment in segments:
-        filename, onset_str, offset_str = segment.strip().split(',')
-        onset, offset = int(onset_str), int(offset_str)
-
-        # Break down the segment into 30-second chunks and execute the CLI command for each
-        for file, chunk_onset, chunk_offset in chunk_segments(filename, onset, offset):
-            cmd = f"python ecg_plot1_ekg_30sec_cli.py {file} {ekg_channel_id} {chunk_onset} {chunk_offset}"
-            os.system(cmd)  # Execute the CLI command
-            print(f"Executed: {cmd}")
+def main(segment_list_file, ekg_channel_id, output_dir=None, engine='template', workers=1, montage=None, writer_threads=0, image_format='png'):
+    # Render every 30-second chunk of the listed segments in this process, each record is read once
+    return render_segment_list(segment_list_file, ekg_channel_id, output_dir, engine, workers, montage, writer_threads, image_format)
 
 if __name__ == "__main__":
-    #segment_list_file = "Case106.segment.list"
-    segment_list_file = sys.argv[1] #"Case106.segment.list"
-    ekg_channel_id = sys.argv[2] #"0"
-    main(segment_list_file, ekg_channel_id)
+    parser = argparse.ArgumentParser(description='Plot the 30 second chunks of every segment in a segment list.')
+    parser.add_argument('segment_list_file', type=str, help='Segment list, record,onset,offset per line (e.g. Case106.segment.list)')
+    parser.add_argument('ekg_channel_id', type=int, help='The channel of the records to plot')
+    parser.add_argument('--output_dir', type=str, help='Directory for the plotted images, defaults to the current folder')
+    parser.add_argument('--engine', type=str, default='template', choices=['template', 'raster', 'figure'],
+                        help="'template' reuses one matplotlib chart, 'raster' draws PNGs without matplotlib, 'figure' builds a figure per chunk")
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes, records are spread over them')
+    parser.add_argument('--montage', type=str, help='Write all chunks as 6 strips per page into this .pdf (or <name>_0001.png sheets) instead of one png each')
+    parser.add_argument('--writer_threads', type=int, default=0, help='Encode and write the images on this many threads while the next chunk is drawn, 0 writes them in turn')
+    parser.add_argument('--image_format', type=str, default='png', choices=['png', 'webp', 'jpg'], help='Image format of --writer_threads, PNGs use the fastest zlib level')
+    args = parser.parse_args()
+    main(args.segment_list_file, args.ekg_channel_id, args.output_dir, None if args.engine == 'figure' else args.engine, args.workers, args.montage,
+         args.writer_threads, args.image_format)
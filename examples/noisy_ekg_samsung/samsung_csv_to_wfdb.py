@@ -1,13 +1,12 @@
-import pandas as pd
+from ecg_plot.csv_reader import read_ekg_csv
 import wfdb
 import numpy as np
 import argparse
 
 def convert_to_wfdb(input_file, output_path, gain):
     # Load the EKG data
-    ekg_data = pd.read_csv(input_file, header=None)
-    ekg_values = ekg_data.values[:,1]
-    ekg_values = ekg_values - np.mean(ekg_values)
+    _, ekg_values = read_ekg_csv(input_file, usecols='value')
+    ekg_values = np.subtract(ekg_values, np.mean(ekg_values, dtype=np.float64), dtype=np.float64)
 
     # Normalize signal if necessary, here assuming the signal is already appropriately scaled
     signals = np.array([ekg_values]).T
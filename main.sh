@@ -1,150 +1,151 @@
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030001_20230202_161300_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030006_20230203_142205_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030007_20230203_150700_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030014_20230207_082507_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030022_20230207_161412_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030035_20230209_151721_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030035_20230209_153131_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030039_20230210_100332_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030049_20230213_090418_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030064_20230221_135348_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030064_20230221_140312_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030065_20230222_111442_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_305030083_20230308_114726_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_306030003_20220902_053420_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DCS_306030006_20230313_135232_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DR_0100025_20220912_133944_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DR_0201003_20221006_144739_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONECG2DR_0405009_20221014_144456_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONIHRNSUB_01010013_20211112_121302_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONIHRNSUB_24010004_20211116_145701_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICONIHRNSUB_24010004_20211116_145751_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_01010001_20210905_091338_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_01010002_20210918_192840_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_01010003_20210918_184609_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_01010007_20211012_194940_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_01010007_20211017_173310_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_01010009_20211015_220206_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_01010014_20211105_201918_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_02010009_20210910_203824_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_02010009_20210913_183958_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_02010011_20210910_151115_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_02010030_20211117_091507_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_03010001_20211001_050749_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010002_20210912_140420_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010005_20211013_152445_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010008_20211025_223542_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010008_20211030_111042_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010010_20211029_154703_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010011_20211106_090537_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010012_20211107_205325_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010014_20211112_080951_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_05010016_20211201_141323_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010011_20210625_011127_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010014_20210630_115425_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010016_20210708_224338_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010017_20210715_090839_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010027_20210724_210304_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010035_20210812_185933_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010041_20210828_215433_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010043_20210914_124705_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010044_20210913_143013_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010045_20210915_121356_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010047_20210929_211231_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010047_20211004_211427_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010050_20211012_195940_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_06010051_20211013_115837_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_07010005_20210601_203512_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_07010006_20210612_162736_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_07010007_20210609_160603_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_07010009_20210615_165043_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_09010001_20211004_122746_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_15010001_20211018_073933_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_15010002_20211124_150810_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_21010003_20211109_144257_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_23010003_20211021_183103_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_23010006_20211102_132319_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_23010007_20211102_153117_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_24010004_20211109_232058_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_ICON_24010004_20211110_133648_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20003_20210422_192130_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20005_20210421_155834_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20007_20210510_094522_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20020_20210628_163843_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20023_20210712_210603_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20025_20210727_220814_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20028_20210802_231948_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20044_20210901_210842_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20059_20211006_174107_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20063_20211016_042736_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20069_20211028_194309_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20069_20211103_155134_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20083_20211207_092332_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20096_20211224_184410_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20096_20211225_194850_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUBH_20103_20211230_203358_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10005_20210226_094937_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10007_20210226_120416_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10012_20210305_102734_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10013_20210305_105732_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10014_20210305_110026_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10015_20210305_135320_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10021_20210309_112336_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10030_20210311_100951_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10036_20210316_120142_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10044_20210319_101152_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10045_20210319_103007_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10049_20210322_134943_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10057_20210324_160348_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10068_20210331_153920_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10072_20210405_133859_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10074_20210405_153605_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10083_20210409_101736_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10089_20210413_101822_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10091_20210414_150641_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10105_20210503_152536_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10114_20210517_151111_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10117_20210520_091720_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10121_20210521_143616_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10122_20210524_102705_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10125_20210526_134228_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10130_20210528_102545_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10139_20210609_143357_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10156_20210622_144228_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10162_20210628_165208_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10178_20210721_153859_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10180_20210726_134112_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10181_20210726_144340_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10197_20210816_143313_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10198_20210820_105217_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10205_20210901_144138_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10208_20210906_151517_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10218_20211029_102510_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10229_20211103_160808_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10237_20211108_152852_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10238_20211108_162915_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10245_20211115_152819_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10259_20211122_165626_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10280_20211210_120626_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10280_20211210_121043_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10290_20211217_100133_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10295_20211220_140736_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10296_20211222_160623_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10302_20220110_163134_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10309_20220121_093037_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10312_20220121_124141_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10317_20220128_094901_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10317_20220128_095354_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10319_20220128_113916_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10320_20220204_101039_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10321_20220204_104607_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10331_20220216_111636_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10348_20220422_144806_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10349_20220425_144246_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10369_20220530_144410_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10375_20220602_135917_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10377_20220607_102629_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10384_20220614_150329_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10394_20220621_152353_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10395_20220627_131028_ECG_AFIB_raw_250Hz.csv
-python ecg_plot1_ekg_30sec_cli_v3.py --input SUB_SNUHB_10401_20220629_162432_ECG_AFIB_raw_250Hz.csv
+python ecg_plot1_ekg_30sec_batch_cli.py \
+    SUB_ICONECG2DCS_305030001_20230202_161300_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030006_20230203_142205_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030007_20230203_150700_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030014_20230207_082507_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030022_20230207_161412_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030035_20230209_151721_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030035_20230209_153131_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030039_20230210_100332_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030049_20230213_090418_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030064_20230221_135348_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030064_20230221_140312_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030065_20230222_111442_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_305030083_20230308_114726_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_306030003_20220902_053420_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DCS_306030006_20230313_135232_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DR_0100025_20220912_133944_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DR_0201003_20221006_144739_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONECG2DR_0405009_20221014_144456_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONIHRNSUB_01010013_20211112_121302_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONIHRNSUB_24010004_20211116_145701_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICONIHRNSUB_24010004_20211116_145751_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_01010001_20210905_091338_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_01010002_20210918_192840_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_01010003_20210918_184609_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_01010007_20211012_194940_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_01010007_20211017_173310_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_01010009_20211015_220206_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_01010014_20211105_201918_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_02010009_20210910_203824_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_02010009_20210913_183958_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_02010011_20210910_151115_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_02010030_20211117_091507_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_03010001_20211001_050749_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010002_20210912_140420_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010005_20211013_152445_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010008_20211025_223542_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010008_20211030_111042_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010010_20211029_154703_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010011_20211106_090537_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010012_20211107_205325_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010014_20211112_080951_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_05010016_20211201_141323_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010011_20210625_011127_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010014_20210630_115425_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010016_20210708_224338_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010017_20210715_090839_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010027_20210724_210304_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010035_20210812_185933_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010041_20210828_215433_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010043_20210914_124705_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010044_20210913_143013_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010045_20210915_121356_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010047_20210929_211231_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010047_20211004_211427_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010050_20211012_195940_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_06010051_20211013_115837_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_07010005_20210601_203512_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_07010006_20210612_162736_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_07010007_20210609_160603_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_07010009_20210615_165043_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_09010001_20211004_122746_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_15010001_20211018_073933_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_15010002_20211124_150810_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_21010003_20211109_144257_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_23010003_20211021_183103_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_23010006_20211102_132319_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_23010007_20211102_153117_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_24010004_20211109_232058_ECG_AFIB_raw_250Hz.csv \
+    SUB_ICON_24010004_20211110_133648_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20003_20210422_192130_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20005_20210421_155834_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20007_20210510_094522_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20020_20210628_163843_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20023_20210712_210603_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20025_20210727_220814_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20028_20210802_231948_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20044_20210901_210842_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20059_20211006_174107_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20063_20211016_042736_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20069_20211028_194309_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20069_20211103_155134_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20083_20211207_092332_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20096_20211224_184410_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20096_20211225_194850_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUBH_20103_20211230_203358_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10005_20210226_094937_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10007_20210226_120416_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10012_20210305_102734_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10013_20210305_105732_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10014_20210305_110026_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10015_20210305_135320_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10021_20210309_112336_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10030_20210311_100951_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10036_20210316_120142_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10044_20210319_101152_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10045_20210319_103007_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10049_20210322_134943_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10057_20210324_160348_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10068_20210331_153920_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10072_20210405_133859_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10074_20210405_153605_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10083_20210409_101736_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10089_20210413_101822_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10091_20210414_150641_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10105_20210503_152536_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10114_20210517_151111_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10117_20210520_091720_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10121_20210521_143616_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10122_20210524_102705_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10125_20210526_134228_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10130_20210528_102545_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10139_20210609_143357_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10156_20210622_144228_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10162_20210628_165208_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10178_20210721_153859_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10180_20210726_134112_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10181_20210726_144340_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10197_20210816_143313_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10198_20210820_105217_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10205_20210901_144138_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10208_20210906_151517_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10218_20211029_102510_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10229_20211103_160808_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10237_20211108_152852_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10238_20211108_162915_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10245_20211115_152819_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10259_20211122_165626_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10280_20211210_120626_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10280_20211210_121043_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10290_20211217_100133_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10295_20211220_140736_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10296_20211222_160623_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10302_20220110_163134_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10309_20220121_093037_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10312_20220121_124141_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10317_20220128_094901_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10317_20220128_095354_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10319_20220128_113916_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10320_20220204_101039_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10321_20220204_104607_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10331_20220216_111636_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10348_20220422_144806_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10349_20220425_144246_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10369_20220530_144410_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10375_20220602_135917_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10377_20220607_102629_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10384_20220614_150329_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10394_20220621_152353_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10395_20220627_131028_ECG_AFIB_raw_250Hz.csv \
+    SUB_SNUHB_10401_20220629_162432_ECG_AFIB_raw_250Hz.csv